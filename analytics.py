@@ -0,0 +1,218 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+# Sentinel day for tasks that have not been closed; larger than any real ordinal
+NOT_CLOSED = np.iinfo(np.int64).max
+
+
+def parse_day(timestamp):
+    """Ordinal day of a GitHub ISO-8601 timestamp such as 2024-05-01T09:30:00Z."""
+    return date.fromisoformat(timestamp[:10]).toordinal()
+
+
+class Task:
+    """Compact, pre-parsed record of one [Task] issue on the project board."""
+
+    __slots__ = ("number", "state", "created_day", "closed_day", "points", "sprint")
+
+    def __init__(self, number, state, created_day, closed_day, points, sprint):
+        self.number = number
+        self.state = state
+        self.created_day = created_day
+        self.closed_day = closed_day
+        self.points = points
+        self.sprint = sprint
+
+    def to_row(self):
+        return [self.number, self.state, self.created_day, self.closed_day, self.points, self.sprint]
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row)
+
+
+def task_arrays(tasks):
+    """Created-day, closed-day (NOT_CLOSED when open) and story-point arrays for tasks."""
+    count = len(tasks)
+    created_days = np.fromiter((task.created_day for task in tasks), dtype=np.int64, count=count)
+    closed_days = np.fromiter((NOT_CLOSED if task.closed_day is None else task.closed_day for task in tasks),
+                              dtype=np.int64, count=count)
+    points = np.fromiter((task.points for task in tasks), dtype=np.int64, count=count)
+    return created_days, closed_days, points
+
+
+class SprintIndex:
+    """Iteration title -> start/end dates, built once and looked up without any I/O.
+
+    Iterations from the Sprint field configuration win over the ones only known from
+    item values (e.g. iterations since removed from the field).
+    """
+
+    def __init__(self):
+        self._dates = {}
+
+    def add(self, title, start_date, duration):
+        if title in self._dates:
+            return
+        start = date.fromisoformat(start_date)
+        self._dates[title] = (start, start + timedelta(days=duration - 1))
+
+    def __contains__(self, title):
+        return title in self._dates
+
+    def dates(self, title):
+        """(start, end) dates of the iteration, or None if it is unknown."""
+        return self._dates.get(title)
+
+    def sprints(self, today=None):
+        today = today or date.today()
+        sprints = []
+        for title, (start, end) in sorted(self._dates.items(), key=lambda entry: entry[1][0]):
+            status = "closed" if end < today else "planned" if start > today else "current"
+            sprints.append({
+                "title": title,
+                "start_date": start.strftime("%Y-%m-%d"),
+                "end_date": end.strftime("%Y-%m-%d"),
+                "status": status
+            })
+        return sprints
+
+
+def cumulative_by_day(days, weights, start_day, total_days):
+    """Running total of weights for every day of the window [start_day, start_day + total_days).
+
+    Events before the window count towards its first day, events after it are dropped.
+    """
+    offsets = np.asarray(days, dtype=np.int64) - start_day
+    weights = np.asarray(weights, dtype=np.int64)
+    in_window = offsets < total_days
+    offsets = np.clip(offsets[in_window], 0, None)
+    per_day = np.bincount(offsets, weights=weights[in_window], minlength=total_days)
+    return np.cumsum(per_day[:total_days]).astype(np.int64)
+
+
+def burndown_series(created_days, closed_days, points, start_day, total_days):
+    """Scope and completed story points for each day of a sprint in O(tasks + days).
+
+    created_days and closed_days are ordinal days (NOT_CLOSED for open tasks) and
+    points the story points of each task. Returns two int64 arrays of length
+    total_days: points created up to each day, and points closed up to each day.
+    """
+    if total_days <= 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    closed_days = np.asarray(closed_days, dtype=np.int64)
+    points = np.asarray(points, dtype=np.int64)
+    closed = closed_days != NOT_CLOSED
+    scope = cumulative_by_day(created_days, points, start_day, total_days)
+    completed = cumulative_by_day(closed_days[closed], points[closed], start_day, total_days)
+    return scope, completed
+
+
+def sprint_batch_series(created_days, closed_days, points, windows):
+    """burndown_series for several sprints from one sweep over the union of their windows.
+
+    windows is a list of (start_day, total_days). Returns the per-sprint
+    (scope, completed) pairs and an array with the story points closed inside
+    each window (the sprint's velocity).
+    """
+    if not windows:
+        return [], np.zeros(0, dtype=np.int64)
+    starts = np.array([start for start, _ in windows], dtype=np.int64)
+    ends = starts + np.array([total for _, total in windows], dtype=np.int64) - 1
+    union_start = int(starts.min())
+    scope, completed = burndown_series(created_days, closed_days, points, union_start, int(ends.max()) - union_start + 1)
+    series = [(scope[start - union_start:start - union_start + total],
+               completed[start - union_start:start - union_start + total]) for start, total in windows]
+
+    closed_days = np.asarray(closed_days, dtype=np.int64)
+    closed = closed_days != NOT_CLOSED
+    order = np.argsort(closed_days[closed], kind="stable")
+    sorted_days = closed_days[closed][order]
+    closed_points = np.concatenate(([0], np.cumsum(np.asarray(points, dtype=np.int64)[closed][order])))
+    velocity = (closed_points[np.searchsorted(sorted_days, ends, side="right")]
+                - closed_points[np.searchsorted(sorted_days, starts, side="left")])
+    return series, velocity
+
+
+def burndown_metrics(chart, today=None):
+    """Series derived from a compute_burndown_chart result, in one linear pass.
+
+    Daily open/closed story points and the cumulative closed line are taken over
+    working days (Mon-Fri); days after today hold the last known open value and close
+    nothing. sprint_completion is the share of the initial commitment burned on
+    working days so far; completion_to_date is the share of it no longer remaining
+    on the latest elapsed sprint day.
+    """
+    today = np.datetime64(today or date.today(), "D")
+    days = np.array([point["date"] for point in chart], dtype="datetime64[D]")
+    ideal = np.array([point["ideal_remaining"] for point in chart], dtype=np.float64)
+    actual = np.array([point["actual_remaining"] for point in chart], dtype=np.int64)
+    initial = float(ideal[0]) if len(chart) else 0.0
+
+    # 1970-01-01 was a Thursday, so (epoch day + 3) % 7 is the weekday with Monday == 0
+    working = (days.astype(np.int64) + 3) % 7 < 5
+    working_days = days[working]
+    working_actual = actual[working]
+    count = len(working_days)
+    elapsed_working = max(int(np.searchsorted(working_days, today, side="right")), 1) if count else 0
+
+    open_points = np.empty(count, dtype=np.int64)
+    open_points[:elapsed_working] = working_actual[:elapsed_working]
+    open_points[elapsed_working:] = working_actual[elapsed_working - 1] if count else 0
+    closed_points = np.zeros(count, dtype=np.float64)
+    if count:
+        closed_points[0] = max(initial - working_actual[0], 0)
+        closed_points[1:elapsed_working] = np.maximum(
+            working_actual[:elapsed_working - 1] - working_actual[1:elapsed_working], 0)
+    cumulative_closed = np.cumsum(closed_points)
+
+    if count:
+        closed_so_far = cumulative_closed[np.minimum(np.arange(len(chart)), count - 1)]
+    else:
+        closed_so_far = np.zeros(len(chart))
+    scope_creep_detected = bool(np.any(actual > initial - closed_so_far))
+    burned_points = float(cumulative_closed[-1]) if count else 0.0
+
+    elapsed_days = int(np.searchsorted(days, today, side="right"))
+    completion = (initial - actual) / initial * 100 if initial > 0 else np.zeros(len(chart))
+    completion_to_date = float(completion[elapsed_days - 1]) if elapsed_days and initial > 0 else 0.0
+
+    today_index = int(np.searchsorted(working_days, today, side="left"))
+    return {
+        "dates": [str(day) for day in days],
+        "ideal_remaining": ideal.tolist(),
+        "actual_remaining": actual.tolist(),
+        "completion": np.round(completion, 2).tolist(),
+        "elapsed_days": elapsed_days,
+        "completion_to_date": completion_to_date,
+        "working_days": [str(day) for day in working_days],
+        "open_points": open_points.tolist(),
+        "closed_points": closed_points.tolist(),
+        "cumulative_closed": cumulative_closed.tolist(),
+        "today_index": today_index if today_index < count else 0,
+        "initial_commitment": initial,
+        "burned_points": burned_points,
+        "sprint_completion": burned_points / initial * 100 if initial > 0 else 0,
+        "scope_creep_detected": scope_creep_detected
+    }
+
+
+def combine_burndowns(charts):
+    """Sum several compute_burndown_chart results day by day.
+
+    Each day of the result adds up the repos whose sprint covers that day, so
+    sprints with slightly different dates still line up on the calendar.
+    """
+    combined = {}
+    for chart in charts:
+        for point in chart:
+            day = combined.setdefault(point["date"], {"date": point["date"], "ideal_remaining": 0,
+                                                      "actual_remaining": 0, "repos": 0})
+            day["ideal_remaining"] += point["ideal_remaining"]
+            day["actual_remaining"] += point["actual_remaining"]
+            day["repos"] += 1
+    for day in combined.values():
+        day["ideal_remaining"] = round(day["ideal_remaining"], 2)
+    return [combined[date] for date in sorted(combined)]
@@ -1,22 +1,29 @@
+import multiprocessing
 import os
 import re
+import time
 import traceback
-from datetime import datetime, timedelta
-from io import BytesIO
-import matplotlib
-import requests
+from datetime import date, datetime, timedelta
 from flask import render_template
 
 from dotenv import load_dotenv
-from flask import Flask, jsonify, request, render_template_string, Response
+from flask import Flask, g, has_request_context, jsonify, request, render_template_string, Response
 from flasgger import Swagger
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 from flask import send_file 
+import hashlib
+import hmac
 import json
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 import logging
+from functools import partial
+from cache import DEFAULT_CACHE_DIR, BlobCache, SnapshotCache, cache_key, token_fingerprint
+from github_client import AsyncGitHubClient, GitHubClient, RateLimitBudget, RateLimitExceeded
+from analytics import (SprintIndex, Task, burndown_metrics, burndown_series, combine_burndowns, parse_day,
+                       sprint_batch_series, task_arrays)
+from render import CHART_STYLE_VERSION, RenderPool, bar_chart_spec, detailed_chart_spec, line_chart_spec, render_svg
+from history import BurndownHistory
+from scheduler import RefreshScheduler
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -62,42 +69,319 @@ DEFAULT_MILESTONE_TITLE = os.getenv("MILESTONE_TITLE", "Milestone I")
 DEFAULT_PROJECT_TITLE = os.getenv("PROJECT_TITLE", "Dashboard Project")
 DEFAULT_SPRINT_NAME = os.getenv("SPRINT_NAME", "Sprint 1")
 
-# Global variables
-GITHUB_TOKEN = DEFAULT_GITHUB_TOKEN
-GITHUB_REPO = DEFAULT_GITHUB_REPO
-MILESTONE_TITLE = DEFAULT_MILESTONE_TITLE
-PROJECT_TITLE = DEFAULT_PROJECT_TITLE
-
-try:
-    repo_owner, repo_name = GITHUB_REPO.split("/")
-except Exception:
-    repo_owner, repo_name = ("", "")
-
-# Headers for APIs
-HEADERS_REST = {"Authorization": f"token {GITHUB_TOKEN}"}
-HEADERS_GRAPHQL = {
-    "Authorization": f"Bearer {GITHUB_TOKEN}",
-    "Content-Type": "application/json"
-}
-GITHUB_API_URL = "https://api.github.com/graphql"
+class DashboardConfig:
+    """GitHub settings of one request; passed explicitly so concurrent requests never share state."""
+
+    __slots__ = ("token", "repo", "repo_owner", "repo_name", "milestone_title", "project_title")
+
+    def __init__(self, token, repo, milestone_title, project_title):
+        if not token:
+            raise ValueError("GitHub token is required")
+        self.token = token
+        self.repo = repo
+        if repo.count("/") != 1:
+            raise ValueError(f"Invalid repository '{repo}', expected owner/repo")
+        self.repo_owner, self.repo_name = repo.split("/")
+        self.milestone_title = milestone_title
+        self.project_title = project_title
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(
+            token=args.get("github_token", DEFAULT_GITHUB_TOKEN),
+            repo=args.get("github_repo", DEFAULT_GITHUB_REPO),
+            milestone_title=args.get("milestone_title", DEFAULT_MILESTONE_TITLE),
+            project_title=args.get("project_title", DEFAULT_PROJECT_TITLE)
+        )
+
+    def for_repo(self, repo):
+        return DashboardConfig(self.token, repo, self.milestone_title, self.project_title)
+
+    @property
+    def rest_headers(self):
+        return {"Authorization": f"token {self.token}"}
+
+    @property
+    def graphql_headers(self):
+        return {
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json"
+        }
+GITHUB_API_BASE = os.getenv("GITHUB_API_BASE", "https://api.github.com").rstrip("/")
+GITHUB_API_URL = os.getenv("GITHUB_GRAPHQL_URL", f"{GITHUB_API_BASE}/graphql")
+
+# Project snapshots shared by all workers on the host
+SNAPSHOT_CACHE_DIR = os.getenv("SNAPSHOT_CACHE_DIR", DEFAULT_CACHE_DIR)
+SNAPSHOT_CACHE_TTL = int(os.getenv("SNAPSHOT_CACHE_TTL", "300"))
+SNAPSHOT_CACHE_MAX_ENTRIES = int(os.getenv("SNAPSHOT_CACHE_MAX_ENTRIES", "64"))
+
+def encode_snapshot(snapshot):
+    if "tasks" not in snapshot:
+        return snapshot
+    return dict(snapshot, tasks=[task.to_row() for task in snapshot["tasks"]])
+
+def decode_snapshot(snapshot):
+    if "tasks" not in snapshot:
+        return snapshot
+    return dict(snapshot, tasks=[Task.from_row(row) for row in snapshot["tasks"]])
+
+# Past the TTL a snapshot is still served (and refreshed in the background) until it is
+# SNAPSHOT_MAX_STALE seconds older; beyond that hard limit requests wait for fresh data
+SNAPSHOT_MAX_STALE = int(os.getenv("SNAPSHOT_MAX_STALE", "3600"))
+snapshot_cache = SnapshotCache(SNAPSHOT_CACHE_DIR, ttl=SNAPSHOT_CACHE_TTL,
+                               max_entries=SNAPSHOT_CACHE_MAX_ENTRIES,
+                               encode=encode_snapshot, decode=decode_snapshot)
+
+# Every [Task] item of a project, kept between refreshes and brought up to date incrementally
+TASK_STORE_TTL = int(os.getenv("TASK_STORE_TTL", str(7 * 24 * 3600)))
+TASK_STORE_FULL_SYNC_INTERVAL = int(os.getenv("TASK_STORE_FULL_SYNC_INTERVAL", str(24 * 3600)))
+
+def encode_task_store(store):
+    return dict(store, items={content_id: [repo, milestone, sprint, task.to_row()]
+                              for content_id, (repo, milestone, sprint, task) in store["items"].items()})
+
+def decode_task_store(store):
+    if any(len(item) != 4 for item in store["items"].values()):
+        # Written before items recorded their repository: empty it and force a full sync
+        return dict(store, schema=None, items={})
+    return dict(store, items={content_id: (repo, milestone, sprint, Task.from_row(row))
+                              for content_id, (repo, milestone, sprint, row) in store["items"].items()})
+
+task_store = SnapshotCache(SNAPSHOT_CACHE_DIR, ttl=TASK_STORE_TTL, max_entries=SNAPSHOT_CACHE_MAX_ENTRIES,
+                           namespace="task_stores", encode=encode_task_store, decode=decode_task_store)
+
+# Daily story point totals of every dashboard, so past days keep the values they had
+burndown_history = BurndownHistory(os.getenv("HISTORY_DIR") or SNAPSHOT_CACHE_DIR)
+
+# Title -> ID resolutions of each repo (milestone numbers, project node ids);
+# an entry is trusted for RESOLUTION_INDEX_TTL seconds or until a lookup through it finds nothing
+RESOLUTION_INDEX_TTL = int(os.getenv("RESOLUTION_INDEX_TTL", str(24 * 3600)))
+resolution_index = SnapshotCache(SNAPSHOT_CACHE_DIR, ttl=RESOLUTION_INDEX_TTL, max_entries=SNAPSHOT_CACHE_MAX_ENTRIES,
+                                 namespace="resolution_index")
+
+# Shared keep-alive client for all GitHub traffic of this worker; REST validators
+# (ETag/Last-Modified plus the body they describe) are shared by all workers
+VALIDATOR_CACHE_TTL = int(os.getenv("VALIDATOR_CACHE_TTL", str(7 * 24 * 3600)))
+github = GitHubClient(
+    api_url=GITHUB_API_BASE,
+    graphql_url=GITHUB_API_URL,
+    connect_timeout=float(os.getenv("GITHUB_CONNECT_TIMEOUT", "5")),
+    read_timeout=float(os.getenv("GITHUB_READ_TIMEOUT", "30")),
+    max_retries=int(os.getenv("GITHUB_MAX_RETRIES", "3")),
+    validator_store=SnapshotCache(SNAPSHOT_CACHE_DIR, ttl=VALIDATOR_CACHE_TTL, max_entries=256,
+                                  namespace="validators"),
+    # Below this share of a token's quota, cached data is preferred over fresh fetches
+    budget=RateLimitBudget(reserve=float(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "0.1")))
+)
+
+# Independent GitHub calls of one request (REST pages, the GraphQL bootstrap) overlap
+github_async = AsyncGitHubClient(github, concurrency=int(os.getenv("GITHUB_CONCURRENCY", "8")))
+
+# Chart rendering runs in its own process pool, off the request workers
+render_pool = RenderPool(
+    workers=int(os.getenv("RENDER_WORKERS", "2")),
+    max_pending=int(os.getenv("RENDER_MAX_PENDING", "8")),
+    timeout=float(os.getenv("RENDER_TIMEOUT", "30"))
+)
+
+def render_chart(spec):
+    try:
+        return render_pool.render(spec)
+    except Exception as e:
+        raise Exception(f"Plotting error: {str(e)}")
+
+# Rendered PNGs, addressed by a digest of everything that goes into them
+image_cache = BlobCache(SNAPSHOT_CACHE_DIR, max_bytes=int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+                        namespace="images", suffix=".png")
+
+# Image route output formats: rendered PNG, native SVG, or the chart spec for client-side drawing
+CHART_FORMATS = {"png": "image/png", "svg": "image/svg+xml", "spec": "application/json"}
+
+def check_chart_format(fmt):
+    if fmt not in CHART_FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}', expected one of: {', '.join(CHART_FORMATS)}")
+
+def chart_digest(spec, fmt="png"):
+    return cache_key("chart", CHART_STYLE_VERSION, fmt, spec, datetime.now().date().isoformat())
+
+def chart_png(digest, spec):
+    png = image_cache.get(digest)
+    if png is None:
+        png = render_chart(spec)
+        image_cache.set(digest, png)
+    return png
+
+def chart_body(digest, spec, fmt):
+    if fmt == "svg":
+        return render_svg(spec).encode("utf-8")
+    if fmt == "spec":
+        return json.dumps(spec).encode("utf-8")
+    return chart_png(digest, spec)
+
+def chart_response(spec, save_path=None, fmt="png"):
+    """Chart response in the requested format with a strong ETag; unchanged charts are neither re-rendered nor resent."""
+    digest = chart_digest(spec, fmt)
+    if not save_path and request.if_none_match.contains(digest):
+        response = Response(status=304)
+    else:
+        body = chart_body(digest, spec, fmt)
+        if save_path:
+            with open(save_path, "wb") as f:
+                f.write(body)
+            return send_file(save_path, mimetype=CHART_FORMATS[fmt], as_attachment=True)
+        response = Response(body, mimetype=CHART_FORMATS[fmt])
+    response.set_etag(digest)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+# Specs behind the short-lived chart URLs handed out by /api/dashboard; rendered on first fetch
+CHART_URL_TTL = int(os.getenv("CHART_URL_TTL", "600"))
+chart_specs = SnapshotCache(SNAPSHOT_CACHE_DIR, ttl=CHART_URL_TTL, max_entries=256, namespace="chart_specs")
+
+def chart_url(spec):
+    digest = chart_digest(spec)
+    if chart_specs.get(digest) is None:
+        chart_specs.set(digest, spec)
+    return f"/api/charts/{digest}.png"
+
+class FetchContext:
+    """Request-scoped memo so each upstream GitHub resource is fetched once per request.
+
+    With refresh=True cached snapshots are reloaded instead of read. stored_at is the
+    time the oldest snapshot used by the request was fetched from GitHub.
+    """
+
+    def __init__(self, refresh=False):
+        self._values = {}
+        self.refresh = refresh
+        self.stored_at = None
+        if has_request_context():
+            g.setdefault("fetch_contexts", []).append(self)
+
+    def note_stored_at(self, stored_at):
+        if self.stored_at is None or stored_at < self.stored_at:
+            self.stored_at = stored_at
+
+    def resolve(self, key, loader):
+        if key not in self._values:
+            self._values[key] = loader()
+        return self._values[key]
+
+    def put(self, key, value):
+        self._values[key] = value
+
+    def pop(self, key):
+        return self._values.pop(key, None)
+
+    def get(self, key):
+        return self._values.get(key)
+
+def snapshot_key(config, milestone_title=None):
+    return cache_key(config.repo, config.project_title, milestone_title, token_fingerprint(config.token))
+
+def cached_snapshot(config, ctx, key, loader):
+    """Snapshot from the shared cache; a stale one within the hard limit is returned at once
+    while the dashboard is refreshed in the background.
+
+    While the token's rate-limit budget is low, or once GitHub refuses the load, a
+    cached snapshot of any age is served instead and no refresh is started.
+    """
+    if ctx.refresh:
+        value, stored_at = snapshot_cache.refresh(key, loader), time.time()
+    else:
+        low_budget = github.budget.is_low(config.token)
+        max_age = float("inf") if low_budget else SNAPSHOT_CACHE_TTL + SNAPSHOT_MAX_STALE
+        entry = snapshot_cache.get_entry(key, max_age=max_age)
+        if entry is None:
+            try:
+                value, stored_at = snapshot_cache.get_or_load(key, loader), time.time()
+            except RateLimitExceeded:
+                entry = snapshot_cache.get_entry(key, max_age=float("inf"))
+                if entry is None:
+                    raise
+                value, stored_at = entry
+        else:
+            value, stored_at = entry
+            if time.time() - stored_at > SNAPSHOT_CACHE_TTL and not low_budget:
+                refresher.trigger(dashboard_key(config), partial(refresh_dashboard, config))
+    ctx.note_stored_at(stored_at)
+    return value
+
+def resolution_key(config):
+    return cache_key(config.repo, token_fingerprint(config.token))
+
+def indexed(config, kind, name):
+    """Entry of the repo's resolution index ("milestones" or "projects"), None if unknown or expired."""
+    index = resolution_index.get(resolution_key(config)) or {}
+    entry = index.get(kind, {}).get(name)
+    if entry is None or time.time() - entry[1] > RESOLUTION_INDEX_TTL:
+        return None
+    return entry[0]
+
+def update_index(config, kind, entries):
+    """Record index entries (None forgets one), leaving the rest of the repo's index untouched."""
+    key = resolution_key(config)
+    with resolution_index.lock(key):
+        index = resolution_index.get(key) or {"repo": config.repo}
+        section = dict(index.get(kind, {}))
+        for name, value in entries.items():
+            if value is None:
+                section.pop(name, None)
+            else:
+                section[name] = [value, time.time()]
+        resolution_index.set(key, dict(index, **{kind: section}))
+
+def get_project_snapshot(config, ctx):
+    """Project id and field map (including the Sprint iterations), reused across requests while fresh."""
+    def load():
+        project_id = indexed(config, "projects", config.project_title)
+        if project_id is not None:
+            try:
+                # Only the field map is fetched: no title search and no item page
+                return {"project_id": project_id, "custom_fields": fetch_custom_fields(config, project_id)}
+            except RateLimitExceeded:
+                raise
+            except Exception as e:
+                # Deleted or recreated under the same title: resolve the title again
+                logger.warning(f"Indexed project '{config.project_title}' no longer resolves: {str(e)}")
+                update_index(config, "projects", {config.project_title: None})
+        bootstrap = fetch_project_bootstrap(config)
+        if bootstrap is None:
+            project_id = fetch_project_id(config)
+            snapshot = {"project_id": project_id, "custom_fields": fetch_custom_fields(config, project_id)}
+        else:
+            # Keep the first item page for this request's task load instead of fetching it again
+            ctx.put("first_items_page", bootstrap["first_items_page"])
+            snapshot = {"project_id": bootstrap["project_id"], "custom_fields": bootstrap["custom_fields"]}
+        update_index(config, "projects", {config.project_title: snapshot["project_id"]})
+        return snapshot
+    return ctx.resolve("project_snapshot", lambda: cached_snapshot(config, ctx, snapshot_key(config), load))
 
 # Core Functions
-def get_milestone_number():
-    if not GITHUB_TOKEN:
-        raise ValueError("GitHub token is required")
-    url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/milestones?state=all&per_page=100"
-    response = requests.get(url, headers=HEADERS_REST)
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch milestones: {response.text}")
-    milestones = response.json()
+def get_milestone_number(config, ctx=None):
+    if ctx is not None:
+        return ctx.resolve("milestone_number", lambda: get_milestone_number(config))
+    number = indexed(config, "milestones", config.milestone_title)
+    if number is not None:
+        return number
+    url = f"{GITHUB_API_BASE}/repos/{config.repo_owner}/{config.repo_name}/milestones?state=all&per_page=100"
+    milestones = []
+    for response in github_async.run(github_async.get_all_pages(url, headers=config.rest_headers)):
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch milestones: {response.text}")
+        milestones.extend(response.json())
+    update_index(config, "milestones", {ms["title"]: ms["number"] for ms in milestones})
     for ms in milestones:
-        if ms.get("title") == MILESTONE_TITLE:
+        if ms.get("title") == config.milestone_title:
             return ms.get("number")
-    raise Exception(f"Milestone '{MILESTONE_TITLE}' not found.")
+    raise Exception(f"Milestone '{config.milestone_title}' not found.")
 
-def fetch_project_id():
-    if not GITHUB_TOKEN:
-        raise ValueError("GitHub token is required")
+def fetch_project_id(config, ctx=None):
+    if ctx is not None:
+        return get_project_snapshot(config, ctx)["project_id"]
+    project_id = indexed(config, "projects", config.project_title)
+    if project_id is not None:
+        return project_id
     query = """
     query {
       repository(owner: "%s", name: "%s") {
@@ -109,8 +393,8 @@ def fetch_project_id():
         }
       }
     }
-    """ % (repo_owner, repo_name)
-    response = requests.post(GITHUB_API_URL, headers=HEADERS_GRAPHQL, json={"query": query})
+    """ % (config.repo_owner, config.repo_name)
+    response = github.post(GITHUB_API_URL, headers=config.graphql_headers, json={"query": query})
     if response.status_code != 200:
         raise Exception(f"Failed to fetch projects: {response.text}")
     data = response.json()
@@ -118,15 +402,20 @@ def fetch_project_id():
         raise Exception(f"GraphQL errors: {data['errors']}")
     projects = data["data"]["repository"]["projectsV2"]["nodes"]
     for project in projects:
-        if project["title"] == PROJECT_TITLE:
+        if project["title"] == config.project_title:
             return project["id"]
-    raise Exception(f"Project '{PROJECT_TITLE}' not found.")
+    raise Exception(f"Project '{config.project_title}' not found.")
 
-def fetch_custom_fields(project_id):
-    query = """
-    query {
-      node(id: "%s") {
-        ... on ProjectV2 {
+# Asked for by the larger queries so their cost is accounted in the rate-limit budget
+RATE_LIMIT_SELECTION = """
+      rateLimit {
+        cost
+        limit
+        remaining
+        resetAt
+      }"""
+
+PROJECT_FIELDS_SELECTION = """
           fields(first: 100) {
             nodes {
               ... on ProjectV2Field {
@@ -152,101 +441,115 @@ def fetch_custom_fields(project_id):
                     duration
                     title
                   }
+                  completedIterations {
+                    startDate
+                    duration
+                    title
+                  }
                 }
               }
             }
           }
-        }
-      }
-    }
-    """ % project_id
-    response = requests.post(GITHUB_API_URL, headers=HEADERS_GRAPHQL, json={"query": query})
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch custom fields: {response.text}")
-    data = response.json()
-    if "errors" in data:
-        raise Exception(f"GraphQL errors: {data['errors']}")
-    if not data or "data" not in data or "node" not in data["data"]:
-        raise Exception(f"Invalid response data: {data}")
-    fields = data["data"]["node"]["fields"]["nodes"]
-    custom_fields = {}
-    for field in fields:
-        field_type = field["__typename"]
-        field_name = field["name"]
-        custom_fields[field_name] = {
-            "id": field["id"],
-            "type": field_type,
-            "options": field.get("options", []),
-            "configuration": field.get("configuration", {})
-        }
-    return custom_fields
+"""
 
-def fetch_project_issues(project_id, after_cursor=None):
-    query = """
-    query {
-      node(id: "%s") {
-        ... on ProjectV2 {
-          items(first: 100%s) {
-            nodes {
-              content {
-                ... on Issue {
+ISSUE_SELECTION = """
                   id
                   number
                   title
                   state
                   closedAt
                   createdAt
-                }
-              }
-              fieldValues(first: 20) {
-                nodes {
-                  ... on ProjectV2ItemFieldSingleSelectValue {
-                    name
-                    field {
-                      ... on ProjectV2SingleSelectField {
-                        name
-                      }
-                    }
-                  }
-                  ... on ProjectV2ItemFieldTextValue {
-                    text
-                    field {
-                      ... on ProjectV2Field {
-                        name
-                      }
-                    }
-                  }
-                  ... on ProjectV2ItemFieldNumberValue {
+                  milestone {
                     number
-                    field {
-                      ... on ProjectV2Field {
-                        name
-                      }
-                    }
                   }
-                  ... on ProjectV2ItemFieldIterationValue {
-                    title
-                    startDate
-                    duration
-                    field {
-                      ... on ProjectV2IterationField {
-                        name
-                      }
-                    }
+                  repository {
+                    nameWithOwner
                   }
+"""
+
+ITEM_FIELD_VALUES_SELECTION = """
+              storyPoints: fieldValueByName(name: "Story Points") {
+                ... on ProjectV2ItemFieldNumberValue {
+                  number
+                }
+                ... on ProjectV2ItemFieldSingleSelectValue {
+                  name
+                }
+                ... on ProjectV2ItemFieldTextValue {
+                  text
                 }
               }
-            }
+              sprint: fieldValueByName(name: "Sprint") {
+                ... on ProjectV2ItemFieldIterationValue {
+                  title
+                  startDate
+                  duration
+                }
+              }
+"""
+
+PROJECT_ITEMS_SELECTION = """
+          items(first: 100%s) {
+            nodes {
+              content {
+                ... on Issue {""" + ISSUE_SELECTION + """                }
+              }""" + ITEM_FIELD_VALUES_SELECTION + """            }
             pageInfo {
               hasNextPage
               endCursor
             }
           }
+"""
+
+def parse_custom_fields(fields):
+    custom_fields = {}
+    for field in fields:
+        if not field:
+            continue
+        field_type = field["__typename"]
+        field_name = field["name"]
+        custom_fields[field_name] = {
+            "id": field["id"],
+            "type": field_type,
+            "options": field.get("options", []),
+            "configuration": field.get("configuration", {})
+        }
+    return custom_fields
+
+def fetch_custom_fields(config, project_id, ctx=None):
+    if ctx is not None:
+        return get_project_snapshot(config, ctx)["custom_fields"]
+    query = """
+    query {
+      node(id: "%s") {
+        ... on ProjectV2 {
+          %s
         }
       }
     }
-    """ % (project_id, f', after: "{after_cursor}"' if after_cursor else "")
-    response = requests.post(GITHUB_API_URL, headers=HEADERS_GRAPHQL, json={"query": query})
+    """ % (project_id, PROJECT_FIELDS_SELECTION)
+    response = github.post(GITHUB_API_URL, headers=config.graphql_headers, json={"query": query})
+    if response.status_code != 200:
+        raise Exception(f"Failed to fetch custom fields: {response.text}")
+    data = response.json()
+    if "errors" in data:
+        raise Exception(f"GraphQL errors: {data['errors']}")
+    if not data or "data" not in data or not data["data"].get("node"):
+        raise Exception(f"Invalid response data: {data}")
+    return parse_custom_fields(data["data"]["node"]["fields"]["nodes"])
+
+def fetch_project_issues(config, project_id, after_cursor=None):
+    query = """
+    query {
+      node(id: "%s") {
+        ... on ProjectV2 {
+          %s
+        }
+      }%s
+    }
+    """ % (project_id, PROJECT_ITEMS_SELECTION % (f', after: "{after_cursor}"' if after_cursor else ""),
+           RATE_LIMIT_SELECTION)
+    response = github.post(GITHUB_API_URL, headers=config.graphql_headers, json={"query": query})
     if response.status_code != 200:
         raise Exception(f"Failed to fetch project issues: {response.text}")
     data = response.json()
@@ -254,142 +557,454 @@ def fetch_project_issues(project_id, after_cursor=None):
         raise Exception(f"GraphQL errors: {data['errors']}")
     if not data or "data" not in data or "node" not in data["data"]:
         raise Exception(f"Invalid response data: {data}")
+    github.budget.record_graphql(config.token, data["data"].get("rateLimit"))
     return data
 
-def extract_story_points(field_values, custom_fields):
+def fetch_project_bootstrap(config):
+    """Resolve the project title, its fields and the first item page in a single GraphQL round trip.
+
+    Returns None when the title search does not surface an exact match, so callers
+    can fall back to listing the repository's projects.
+    """
+    query = """
+    query($owner: String!, $name: String!, $title: String!) {
+      repository(owner: $owner, name: $name) {
+        projectsV2(first: 10, query: $title) {
+          nodes {
+            id
+            title
+            %s
+            %s
+          }
+        }
+      }%s
+    }
+    """ % (PROJECT_FIELDS_SELECTION, PROJECT_ITEMS_SELECTION % "", RATE_LIMIT_SELECTION)
+    variables = {"owner": config.repo_owner, "name": config.repo_name, "title": config.project_title}
+    response = github.post(GITHUB_API_URL, headers=config.graphql_headers, json={"query": query, "variables": variables})
+    if response.status_code != 200:
+        raise Exception(f"Failed to fetch project: {response.text}")
+    data = response.json()
+    if "errors" in data:
+        raise Exception(f"GraphQL errors: {data['errors']}")
+    repository = (data.get("data") or {}).get("repository")
+    if not repository:
+        raise Exception(f"Invalid response data: {data}")
+    github.budget.record_graphql(config.token, data["data"].get("rateLimit"))
+    for project in repository["projectsV2"]["nodes"]:
+        if project and project["title"] == config.project_title:
+            return {
+                "project_id": project["id"],
+                "custom_fields": parse_custom_fields(project["fields"]["nodes"]),
+                "first_items_page": {"data": {"node": {"items": project["items"]}}}
+            }
+    return None
+
+def extract_story_points(field_value, custom_fields):
+    if not field_value:
+        return 0
     story_points_field = custom_fields.get("Story Points", {})
     field_type = story_points_field.get("type", "")
-    for field_value in field_values:
-        if "field" in field_value and field_value["field"]["name"] == "Story Points":
-            if field_type == "ProjectV2Field" and "number" in field_value:
-                return int(field_value["number"]) if field_value["number"] else 0
-            elif field_type == "ProjectV2SingleSelectField" and "name" in field_value:
-                return int(field_value["name"]) if field_value["name"].isdigit() else 0
-            elif field_type == "ProjectV2Field" and "text" in field_value:
-                match = re.match(r"(\d+)", field_value["text"])
-                return int(match.group(1)) if match else 0
+    if field_type == "ProjectV2Field" and "number" in field_value:
+        return int(field_value["number"]) if field_value["number"] else 0
+    elif field_type == "ProjectV2SingleSelectField" and "name" in field_value:
+        return int(field_value["name"]) if field_value["name"].isdigit() else 0
+    elif field_type == "ProjectV2Field" and "text" in field_value:
+        match = re.match(r"(\d+)", field_value["text"])
+        return int(match.group(1)) if match else 0
     return 0
 
-def get_issues_for_milestone_and_project():
-    milestone_number = get_milestone_number()
-    project_id = fetch_project_id()
-    custom_fields = fetch_custom_fields(project_id)
-    all_issues = []
+def task_from_item(issue, item, custom_fields):
+    closed_day = None
+    if issue.get("state", "").upper() == "CLOSED" and issue.get("closedAt"):
+        closed_day = parse_day(issue["closedAt"])
+    sprint = item.get("sprint") or {}
+    return Task(
+        number=issue["number"],
+        state=issue["state"],
+        created_day=parse_day(issue["createdAt"]),
+        closed_day=closed_day,
+        points=extract_story_points(item.get("storyPoints"), custom_fields),
+        sprint=sprint.get("title")
+    )
+
+def get_issues_for_milestone_and_project(config, ctx=None):
+    snapshot = get_milestone_snapshot(config, ctx or FetchContext())
+    return snapshot["tasks"], snapshot["custom_fields"]
+
+def get_milestone_snapshot(config, ctx):
+    """Tasks of the milestone, the field map and the iterations seen on its items."""
+    return ctx.resolve("milestone_snapshot", lambda: cached_snapshot(
+        config, ctx, snapshot_key(config, config.milestone_title), lambda: _load_milestone_snapshot(config, ctx)))
+
+def _load_milestone_snapshot(config, ctx):
+    # The milestone list does not depend on the project items, so a cold load pages
+    # through both at once; chart routes load this snapshot first to get that overlap
+    milestone_number, (custom_fields, task_items) = github_async.parallel(
+        lambda: get_milestone_number(config, ctx),
+        lambda: _load_task_items(config, ctx)
+    )
+    snapshot = milestone_snapshot(snapshot_key(config), config.repo, milestone_number, custom_fields, task_items)
+    if not snapshot["tasks"] and indexed(config, "milestones", config.milestone_title) == milestone_number:
+        # No task in the indexed milestone: the title may have moved to another one since
+        update_index(config, "milestones", {config.milestone_title: None})
+        ctx.pop("milestone_number")
+        snapshot = milestone_snapshot(snapshot_key(config), config.repo, get_milestone_number(config, ctx),
+                                      custom_fields, task_items)
+    record_history(dashboard_key(config), snapshot["tasks"])
+    return snapshot
+
+def record_history(key, tasks):
+    """Append today's scope/completed totals of a milestone snapshot to the dashboard's history."""
+    today = date.today().toordinal()
+    scope, completed = burndown_series(*task_arrays(tasks), today, 1)
+    burndown_history.record(key, today, int(scope[0]), int(completed[0]))
+
+def milestone_snapshot(store_key, repo, milestone_number, custom_fields, task_items):
+    tasks = []
+    iterations = {}
+    for item_repo, item_milestone, sprint, task in task_items:
+        # Boards can hold issues of several repos, each numbering its milestones from 1
+        if item_repo != repo or item_milestone != milestone_number:
+            continue
+        if sprint and sprint.get("title"):
+            iterations.setdefault(sprint["title"], {"startDate": sprint["startDate"],
+                                                    "duration": sprint["duration"]})
+        tasks.append(task)
+    return {
+        "tasks": tasks,
+        "custom_fields": custom_fields,
+        "iterations": iterations,
+        # Lets webhook updates of the task store rebuild this snapshot without GitHub
+        "task_store_key": store_key,
+        "milestone_number": milestone_number
+    }
+
+def field_schema(custom_fields):
+    """Digest of the project's field definitions; iteration dates are left out so new sprints keep the store."""
+    return cache_key(sorted((name, field["type"], field["options"]) for name, field in custom_fields.items()))
+
+def task_item(issue, item, custom_fields):
+    """(repository, milestone number, sprint value, Task) for a [Task] issue, None for anything else."""
+    if not issue or "createdAt" not in issue or "[Task]" not in issue["title"]:
+        return None
+    return (issue["repository"]["nameWithOwner"], (issue.get("milestone") or {}).get("number"), item.get("sprint"),
+            task_from_item(issue, item, custom_fields))
+
+def _load_task_items(config, ctx):
+    """Field map and (repository, milestone number, sprint value, Task) for every [Task] issue on the project board.
+
+    Items come from the persisted task store. After the first full load only issues
+    updated since the last sync are fetched; the store is rebuilt when the project's
+    field schema changes, and every TASK_STORE_FULL_SYNC_INTERVAL seconds because edits
+    to project fields alone do not mark an issue as updated (unless the token is
+    short on rate limit).
+    """
+    project_id = fetch_project_id(config, ctx)
+    custom_fields = fetch_custom_fields(config, project_id, ctx)
+    first_page = ctx.pop("first_items_page")
+    key = snapshot_key(config)
+    schema = field_schema(custom_fields)
+    with task_store.lock(key):
+        store = task_store.get(key)
+        started_at = time.time()
+        # The periodic full resync waits while the rate-limit budget is low
+        full_sync_due = (started_at - store["full_sync_at"] > TASK_STORE_FULL_SYNC_INTERVAL
+                         and not github.budget.is_low(config.token)) if store else True
+        if store is None or store["schema"] != schema or store["project_id"] != project_id or full_sync_due:
+            items = fetch_all_task_items(config, project_id, custom_fields, first_page)
+            store = {"schema": schema, "repo": config.repo, "project_id": project_id, "full_sync_at": started_at}
+        else:
+            items = dict(store["items"])
+            for content_id, task in fetch_updated_task_items(config, project_id, custom_fields, store["watermark"]).items():
+                if task is None:
+                    items.pop(content_id, None)
+                else:
+                    items[content_id] = task
+        # Anything GitHub changes from here on is picked up by the next sync; the margin covers clock skew
+        store = dict(store, items=items, custom_fields=custom_fields, watermark=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(started_at - 60)))
+        task_store.set(key, store)
+    return custom_fields, list(items.values())
+
+def fetch_all_task_items(config, project_id, custom_fields, data=None):
+    items = {}
     after_cursor = None
     
+    # Pages are reduced to Task records as they arrive and dropped straight after
     while True:
-        data = fetch_project_issues(project_id, after_cursor)
-        items = data["data"]["node"]["items"]["nodes"]
-        all_issues.extend(items)
+        if data is None:
+            data = fetch_project_issues(config, project_id, after_cursor)
+        for item in data["data"]["node"]["items"]["nodes"]:
+            issue = item.get("content")
+            entry = task_item(issue, item, custom_fields)
+            if entry is not None:
+                items[issue["id"]] = entry
         page_info = data["data"]["node"]["items"]["pageInfo"]
         if not page_info["hasNextPage"]:
             break
         after_cursor = page_info["endCursor"]
+        data = None
     
-    url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/issues?milestone={milestone_number}&state=all&per_page=100"
-    response = requests.get(url, headers=HEADERS_REST)
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch milestone issues: {response.text}")
-    milestone_issues = response.json()
-    milestone_issue_numbers = {issue["number"] for issue in milestone_issues}
-    
-    tasks = []
-    for item in all_issues:
-        if "content" not in item or not item["content"]:
-            continue
-        issue = item["content"]
-        if (issue["number"] in milestone_issue_numbers and 
-            "[Task]" in issue["title"] and 
-            "createdAt" in issue):
-            issue["fieldValues"] = item["fieldValues"]["nodes"]
-            tasks.append(issue)
-    
-    return tasks, custom_fields
+    return items
+
+def fetch_updated_issue_ids(config, since):
+    url = (f"{GITHUB_API_BASE}/repos/{config.repo_owner}/{config.repo_name}/issues"
+           f"?state=all&since={since}&per_page=100")
+    issue_ids = []
+    for response in github_async.run(github_async.get_all_pages(url, headers=config.rest_headers, conditional=False)):
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch updated issues: {response.text}")
+        issue_ids.extend(issue["node_id"] for issue in response.json() if "pull_request" not in issue)
+    return issue_ids
 
-def fetch_project_sprints(project_id):
+def fetch_updated_task_items(config, project_id, custom_fields, since):
+    """Current task item (or None when it no longer counts) for every issue updated since the watermark."""
+    return fetch_task_items(config, project_id, custom_fields, fetch_updated_issue_ids(config, since))
+
+def fetch_task_items(config, project_id, custom_fields, issue_ids):
+    """Current task item of each issue on the project, or None when it no longer counts."""
+    query = """
+    query($ids: [ID!]!) {
+      nodes(ids: $ids) {
+        ... on Issue {%s
+          projectItems(first: 20) {
+            nodes {
+              project {
+                id
+              }%s
+            }
+          }
+        }
+      }%s
+    }
+    """ % (ISSUE_SELECTION, ITEM_FIELD_VALUES_SELECTION, RATE_LIMIT_SELECTION)
+    items = {}
+    for batch_start in range(0, len(issue_ids), 100):
+        batch = issue_ids[batch_start:batch_start + 100]
+        response = github.post(GITHUB_API_URL, headers=config.graphql_headers,
+                               json={"query": query, "variables": {"ids": batch}})
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch issues: {response.text}")
+        data = response.json()
+        if "errors" in data:
+            raise Exception(f"GraphQL errors: {data['errors']}")
+        github.budget.record_graphql(config.token, data["data"].get("rateLimit"))
+        for content_id, issue in zip(batch, data["data"]["nodes"]):
+            project_items = ((issue or {}).get("projectItems") or {}).get("nodes") or []
+            item = next((item for item in project_items if item and item["project"]["id"] == project_id), None)
+            items[content_id] = task_item(issue, item, custom_fields) if item else None
+    return items
+
+def fetch_project_sprints(config, project_id, ctx=None):
     try:
-        custom_fields = fetch_custom_fields(project_id)
-        sprint_field = custom_fields.get("Sprint")
-        if not sprint_field or sprint_field["type"] != "ProjectV2IterationField":
-            raise Exception("Sprint field (Iteration type) not found in project")
-
-        current_date = datetime.now().date()
-        sprints = []
-        for iteration in sprint_field["configuration"]["iterations"]:
-            start_date = datetime.strptime(iteration["startDate"], "%Y-%m-%d").date()
-            end_date = start_date + timedelta(days=iteration["duration"] - 1)
-            status = "closed" if end_date < current_date else "planned" if start_date > current_date else "current"
-            sprints.append({
-                "title": iteration["title"],
-                "start_date": iteration["startDate"],
-                "end_date": end_date.strftime("%Y-%m-%d"),
-                "status": status
-            })
-        return sprints
+        if ctx is not None:
+            return get_sprint_index(config, ctx).sprints()
+        return sprint_index_from_custom_fields(fetch_custom_fields(config, project_id)).sprints()
+    except RateLimitExceeded:
+        raise
     except Exception as e:
         raise Exception(f"Failed to fetch sprints: {str(e)}")
 
-def get_sprint_dates(sprint_name, sprints_list=None):
+def sprint_index_from_custom_fields(custom_fields, item_iterations=None):
+    sprint_field = custom_fields.get("Sprint")
+    if not sprint_field or sprint_field["type"] != "ProjectV2IterationField":
+        raise Exception("Sprint field (Iteration type) not found in project")
+
+    index = SprintIndex()
+    configuration = sprint_field.get("configuration") or {}
+    for iteration in (configuration.get("iterations") or []) + (configuration.get("completedIterations") or []):
+        index.add(iteration["title"], iteration["startDate"], iteration["duration"])
+    for title, iteration in (item_iterations or {}).items():
+        index.add(title, iteration["startDate"], iteration["duration"])
+    return index
+
+def get_sprint_index(config, ctx):
+    """Sprint index for the request; includes iterations seen on items once they are loaded."""
+    milestone_snapshot = ctx.get("milestone_snapshot")
+    item_iterations = milestone_snapshot["iterations"] if milestone_snapshot else None
+    return ctx.resolve(("sprint_index", item_iterations is not None), lambda: sprint_index_from_custom_fields(
+        get_project_snapshot(config, ctx)["custom_fields"], item_iterations))
+
+def get_sprint_dates(config, sprint_name, sprints_list=None, ctx=None):
     try:
         if sprints_list:
             for sprint in sprints_list:
                 if sprint["title"] == sprint_name:
                     return sprint["start_date"], sprint["end_date"]
         
-        tasks, _ = get_issues_for_milestone_and_project()
-        for issue in tasks:
-            for fv in issue.get("fieldValues", []):
-                if fv.get("field", {}).get("name") == "Sprint" and "title" in fv:
-                    if fv["title"] == sprint_name:
-                        start_date = fv["startDate"]
-                        end_date = (datetime.strptime(fv["startDate"], "%Y-%m-%d") + 
-                                  timedelta(days=fv["duration"] - 1)).strftime("%Y-%m-%d")
-                        return start_date, end_date
+        sprint_dates = get_sprint_index(config, ctx or FetchContext()).dates(sprint_name)
+        if sprint_dates:
+            return tuple(day.strftime("%Y-%m-%d") for day in sprint_dates)
         raise Exception(f"No sprint dates found for sprint '{sprint_name}'")
+    except RateLimitExceeded:
+        raise
     except Exception as e:
         raise Exception(f"Failed to get sprint dates: {str(e)}")
 
-def compute_burndown_chart(sprint_name, sprints_list=None):
-    tasks, custom_fields = get_issues_for_milestone_and_project()
-    if not tasks:
-        raise Exception(f"No tasks found for milestone '{MILESTONE_TITLE}' in project '{PROJECT_TITLE}'")
-    
-    sprint_start, sprint_end = get_sprint_dates(sprint_name, sprints_list)
+def compute_burndown_chart(config, sprint_name, sprints_list=None, ctx=None):
+    """Burndown of one sprint; recorded days come from the history, the rest is computed from the tasks.
+
+    A sprint that ended before today and was recorded on every day is answered from
+    the history alone.
+    """
+    if ctx is None:
+        ctx = FetchContext()
+    sprint_start, sprint_end = get_sprint_dates(config, sprint_name, sprints_list, ctx)
     sprint_start_date = datetime.strptime(sprint_start, "%Y-%m-%d").date()
     sprint_end_date = datetime.strptime(sprint_end, "%Y-%m-%d").date()
     total_days = (sprint_end_date - sprint_start_date).days + 1
+    start_day = sprint_start_date.toordinal()
     
-    initial_points = sum(extract_story_points(issue["fieldValues"], custom_fields)
-                         for issue in tasks
-                         if datetime.strptime(issue["createdAt"], "%Y-%m-%dT%H:%M:%SZ").date() <= sprint_start_date)
+    chart = recorded_chart(config, sprint_start_date, total_days)
+    if chart is not None:
+        return chart
     
-    chart = []
-    current_total_points = initial_points
+    tasks, _ = get_issues_for_milestone_and_project(config, ctx)
+    if not tasks:
+        raise Exception(f"No tasks found for milestone '{config.milestone_title}' in project '{config.project_title}'")
+    scope, completed = burndown_series(*task_arrays(tasks), start_day, total_days)
+    scope, completed, _ = with_recorded_days(config, start_day, scope, completed)
+    return chart_points(sprint_start_date, scope, completed)
+
+def recorded_chart(config, sprint_start_date, total_days):
+    """Chart of a sprint that ended before today and was recorded on every day, else None."""
+    start_day = sprint_start_date.toordinal()
+    days, scope, completed = burndown_history.read(dashboard_key(config), start_day, start_day + total_days - 1)
+    if len(days) == total_days and days[-1] < date.today().toordinal():
+        return chart_points(sprint_start_date, scope, completed)
+    return None
+
+def prefetch_chart_tasks(config, sprint_name, ctx):
+    """Load the milestone's tasks for a chart request, unless the history alone answers it.
+
+    Loading them up front lets the milestone list and the item pages be fetched at
+    once. A fully recorded past sprint needs neither: its chart costs a history read
+    and the project's field map (cached with the project snapshot).
+    """
+    sprint_dates = get_sprint_index(config, ctx).dates(sprint_name) if sprint_name != "*" else None
+    if sprint_dates is None or recorded_chart(config, sprint_dates[0], (sprint_dates[1] - sprint_dates[0]).days + 1) is None:
+        get_milestone_snapshot(config, ctx)
+
+def with_recorded_days(config, start_day, scope, completed):
+    """Recomputed scope/completed series with the recorded totals of days before today swapped in.
+
+    Also returns the completed total recorded for the day before start_day, or None.
+    """
+    end_day = min(start_day + len(scope), date.today().toordinal()) - 1
+    days, recorded_scope, recorded_completed = burndown_history.read(dashboard_key(config), start_day - 1, end_day)
+    completed_before = int(recorded_completed[0]) if len(days) and days[0] == start_day - 1 else None
+    in_window = days >= start_day
+    scope, completed = scope.copy(), completed.copy()
+    scope[days[in_window] - start_day] = recorded_scope[in_window]
+    completed[days[in_window] - start_day] = recorded_completed[in_window]
+    return scope, completed, completed_before
+
+def chart_points(sprint_start_date, scope, completed):
+    total_days = len(scope)
+    remaining = np.maximum(scope - completed, 0)
+    initial_points = int(scope[0]) if total_days > 0 else 0
     
+    chart = []
     for day_index in range(total_days):
         current_date = sprint_start_date + timedelta(days=day_index)
         ideal_remaining = (initial_points - (initial_points * day_index / (total_days - 1))
                           if total_days > 1 else initial_points)
-        
-        day_points = sum(extract_story_points(issue["fieldValues"], custom_fields)
-                         for issue in tasks
-                         if datetime.strptime(issue["createdAt"], "%Y-%m-%dT%H:%M:%SZ").date() <= current_date)
-        current_total_points = day_points
-        
-        completed_points = sum(extract_story_points(issue["fieldValues"], custom_fields)
-                              for issue in tasks
-                              if issue.get("state", "").upper() == "CLOSED" and issue.get("closedAt")
-                              and datetime.strptime(issue["closedAt"], "%Y-%m-%dT%H:%M:%SZ").date() <= current_date)
-        
-        actual_remaining = max(current_total_points - completed_points, 0)
         chart.append({
             "date": current_date.strftime("%Y-%m-%d"),
             "ideal_remaining": round(ideal_remaining, 2),
-            "actual_remaining": actual_remaining
+            "actual_remaining": int(remaining[day_index])
         })
     
     return chart
 
+def compute_all_burndown_charts(config, sprints_list, ctx=None):
+    """Charts of every sprint in sprints_list, with velocity and carry-over, from one pass over the tasks.
+
+    velocity is the story points closed during the sprint's dates; carry_over the
+    points still open on its last day (provisional while the sprint is not closed).
+    Days recorded in the dashboard's history override the recomputed ones.
+    """
+    if ctx is None:
+        ctx = FetchContext()
+    tasks, _ = get_issues_for_milestone_and_project(config, ctx)
+    if not tasks:
+        raise Exception(f"No tasks found for milestone '{config.milestone_title}' in project '{config.project_title}'")
+    
+    start_dates = [datetime.strptime(sprint["start_date"], "%Y-%m-%d").date() for sprint in sprints_list]
+    windows = [(start_date.toordinal(), (datetime.strptime(sprint["end_date"], "%Y-%m-%d").date() - start_date).days + 1)
+               for sprint, start_date in zip(sprints_list, start_dates)]
+    series, velocity = sprint_batch_series(*task_arrays(tasks), windows)
+    
+    results = []
+    for sprint, start_date, (scope, completed), closed_points in zip(sprints_list, start_dates, series, velocity):
+        if len(scope):
+            # Velocity is what the (possibly recorded) completed total grew by over the sprint
+            closed_before = int(completed[-1]) - int(closed_points)
+            scope, completed, recorded_before = with_recorded_days(config, start_date.toordinal(), scope, completed)
+            closed_points = int(completed[-1]) - (closed_before if recorded_before is None else recorded_before)
+        chart = chart_points(start_date, scope, completed)
+        results.append(dict(
+            sprint,
+            committed=int(scope[0]) if len(scope) else 0,
+            velocity=int(closed_points),
+            carry_over=chart[-1]["actual_remaining"] if chart else 0,
+            chart=chart
+        ))
+    return results
+
+# Background refresh of the dashboards saved through /api/config
+REFRESH_INTERVAL = int(os.getenv("REFRESH_INTERVAL", "240"))
+
+def dashboard_key(config):
+    return snapshot_key(config, config.milestone_title)
+
+def refresh_dashboard(config):
+    if github.budget.is_low(config.token):
+        logger.info(f"Deferring refresh of {config.repo}: GitHub rate-limit budget is low")
+        return
+    get_milestone_snapshot(config, FetchContext(refresh=True))
+
+def configured_dashboards():
+    if not os.path.exists(CONFIG_FILE):
+        return []
+    with open(CONFIG_FILE, "r") as f:
+        config = json.load(f)
+    dashboards = []
+    for repo in config.get("repos") or [config.get("github_repo", DEFAULT_GITHUB_REPO)]:
+        try:
+            dashboards.append(DashboardConfig(
+                token=config.get("github_token") or DEFAULT_GITHUB_TOKEN,
+                repo=repo,
+                milestone_title=config.get("milestone_title", DEFAULT_MILESTONE_TITLE),
+                project_title=config.get("project_title", DEFAULT_PROJECT_TITLE)
+            ))
+        except ValueError as e:
+            logger.warning(f"Skipping background refresh of {repo}: {str(e)}")
+    return dashboards
+
+def refresh_jobs():
+    return [(dashboard_key(config), partial(refresh_dashboard, config)) for config in configured_dashboards()]
+
+refresher = RefreshScheduler(REFRESH_INTERVAL, refresh_jobs, os.path.join(SNAPSHOT_CACHE_DIR, "refresh-locks"))
+
+@app.before_request
+def start_refresher():
+    # Started from the first request rather than at import, so that processes which only
+    # import this module (render pool children, CLI tools) do not poll GitHub
+    refresher.start()
+
+@app.after_request
+def add_data_age(response):
+    stored_at = [ctx.stored_at for ctx in g.get("fetch_contexts", []) if ctx.stored_at is not None]
+    if stored_at:
+        response.headers["X-Data-Age"] = str(int(time.time() - min(stored_at)))
+    return response
+
+def rate_limited_response(e):
+    response = jsonify({"error": str(e), "retry_after": e.retry_after})
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response, 429
+
 # Routes
 @app.route("/")
 def home():
@@ -427,23 +1042,16 @@ def home():
 
 @app.route("/generate")
 def generate():
-    global GITHUB_TOKEN, GITHUB_REPO, MILESTONE_TITLE, PROJECT_TITLE, repo_owner, repo_name
-    GITHUB_TOKEN = request.args.get("github_token", DEFAULT_GITHUB_TOKEN)
-    GITHUB_REPO = request.args.get("github_repo", DEFAULT_GITHUB_REPO)
-    MILESTONE_TITLE = request.args.get("milestone_title", DEFAULT_MILESTONE_TITLE)
-    PROJECT_TITLE = request.args.get("project_title", DEFAULT_PROJECT_TITLE)
     sprint = request.args.get("sprint", DEFAULT_SPRINT_NAME)
     try:
-        if not GITHUB_TOKEN:
-            raise ValueError("GitHub token is required")
-        repo_owner, repo_name = GITHUB_REPO.split("/")
-        HEADERS_REST["Authorization"] = f"token {GITHUB_TOKEN}"
-        HEADERS_GRAPHQL["Authorization"] = f"Bearer {GITHUB_TOKEN}"
-        project_id = fetch_project_id()
-        sprints = fetch_project_sprints(project_id)
-        chart = compute_burndown_chart(sprint, sprints)
+        config = DashboardConfig.from_args(request.args)
+        ctx = FetchContext()
+        prefetch_chart_tasks(config, sprint, ctx)
+        project_id = fetch_project_id(config, ctx)
+        sprints = fetch_project_sprints(config, project_id, ctx)
+        chart = compute_burndown_chart(config, sprint, sprints, ctx)
         html = "<html><head><title>Burndown Chart</title></head><body>"
-        html += f"<h1>Burndown Chart for Milestone '{MILESTONE_TITLE}' in Project '{PROJECT_TITLE}'</h1>"
+        html += f"<h1>Burndown Chart for Milestone '{config.milestone_title}' in Project '{config.project_title}'</h1>"
         html += "<table border='1' cellspacing='0' cellpadding='5'><tr><th>Date</th><th>Ideal Remaining</th><th>Actual Remaining</th></tr>"
         for point in chart:
             html += f"<tr><td>{point['date']}</td><td>{point['ideal_remaining']}</td><td>{point['actual_remaining']}</td></tr>"
@@ -451,321 +1059,239 @@ def generate():
         return html
     except ValueError as ve:
         return f"Error: {str(ve)}", 400
+    except RateLimitExceeded as e:
+        return f"Error: {str(e)}", 429, {"Retry-After": str(e.retry_after)}
     except Exception as e:
         logger.error(f"Generate error: {str(e)}")
         return f"Error: {str(e)}", 500
 
 @app.route("/api/sprints", methods=["GET"])
 def api_get_sprints():
-    global GITHUB_TOKEN, GITHUB_REPO, PROJECT_TITLE, repo_owner, repo_name
-    GITHUB_TOKEN = request.args.get("github_token", DEFAULT_GITHUB_TOKEN)
-    GITHUB_REPO = request.args.get("github_repo", DEFAULT_GITHUB_REPO)
-    PROJECT_TITLE = request.args.get("project_title", DEFAULT_PROJECT_TITLE)
     try:
-        if not GITHUB_TOKEN:
-            raise ValueError("GitHub token is required")
-        repo_owner, repo_name = GITHUB_REPO.split("/")
-        HEADERS_REST["Authorization"] = f"token {GITHUB_TOKEN}"
-        HEADERS_GRAPHQL["Authorization"] = f"Bearer {GITHUB_TOKEN}"
-        project_id = fetch_project_id()
-        sprints = fetch_project_sprints(project_id)
+        config = DashboardConfig.from_args(request.args)
+        ctx = FetchContext()
+        project_id = fetch_project_id(config, ctx)
+        sprints = fetch_project_sprints(config, project_id, ctx)
         return jsonify(sprints)
     except ValueError as ve:
         return jsonify({"error": str(ve)}), 400
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
     except Exception as e:
         logger.error(f"Sprints error: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 @app.route("/api/burndownchart", methods=["GET"])
 def api_burndown_chart():
-    global GITHUB_TOKEN, GITHUB_REPO, MILESTONE_TITLE, PROJECT_TITLE, repo_owner, repo_name
-    GITHUB_TOKEN = request.args.get("github_token", DEFAULT_GITHUB_TOKEN)
-    GITHUB_REPO = request.args.get("github_repo", DEFAULT_GITHUB_REPO)
-    MILESTONE_TITLE = request.args.get("milestone_title", DEFAULT_MILESTONE_TITLE)
-    PROJECT_TITLE = request.args.get("project_title", DEFAULT_PROJECT_TITLE)
     sprint = request.args.get("sprint", DEFAULT_SPRINT_NAME)
     try:
-        if not GITHUB_TOKEN:
-            raise ValueError("GitHub token is required")
-        repo_owner, repo_name = GITHUB_REPO.split("/")
-        HEADERS_REST["Authorization"] = f"token {GITHUB_TOKEN}"
-        HEADERS_GRAPHQL["Authorization"] = f"Bearer {GITHUB_TOKEN}"
-        project_id = fetch_project_id()
-        sprints = fetch_project_sprints(project_id)
-        chart = compute_burndown_chart(sprint, sprints)
+        config = DashboardConfig.from_args(request.args)
+        ctx = FetchContext()
+        prefetch_chart_tasks(config, sprint, ctx)
+        project_id = fetch_project_id(config, ctx)
+        sprints = fetch_project_sprints(config, project_id, ctx)
+        if sprint == "*":
+            return jsonify({"sprints": compute_all_burndown_charts(config, sprints, ctx)})
+        chart = compute_burndown_chart(config, sprint, sprints, ctx)
         return jsonify({"chart": chart})
     except ValueError as ve:
         return jsonify({"error": str(ve)}), 400
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
     except Exception as e:
         logger.error(f"Burndown chart error: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/burndownchart/metrics", methods=["GET"])
+def api_burndown_metrics():
+    sprint = request.args.get("sprint", DEFAULT_SPRINT_NAME)
+    try:
+        config = DashboardConfig.from_args(request.args)
+        ctx = FetchContext()
+        prefetch_chart_tasks(config, sprint, ctx)
+        project_id = fetch_project_id(config, ctx)
+        sprints = fetch_project_sprints(config, project_id, ctx)
+        chart = compute_burndown_chart(config, sprint, sprints, ctx)
+        return jsonify({"sprint": sprint, "metrics": burndown_metrics(chart)})
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
+    except Exception as e:
+        logger.error(f"Burndown metrics error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route("/api/burndownchart_image_bars", methods=["GET"])
 def burndown_chart_image_bars():
-    global GITHUB_TOKEN, GITHUB_REPO, MILESTONE_TITLE, PROJECT_TITLE, repo_owner, repo_name
-    GITHUB_TOKEN = request.args.get("github_token", DEFAULT_GITHUB_TOKEN)
-    GITHUB_REPO = request.args.get("github_repo", DEFAULT_GITHUB_REPO)
-    MILESTONE_TITLE = request.args.get("milestone_title", DEFAULT_MILESTONE_TITLE)
-    PROJECT_TITLE = request.args.get("project_title", DEFAULT_PROJECT_TITLE)
     sprint = request.args.get("sprint", DEFAULT_SPRINT_NAME)
     save_path = request.args.get("save_path")
+    fmt = request.args.get("format", "png")
     
     if save_path and (not os.path.isabs(save_path) or not os.access(os.path.dirname(save_path) or ".", os.W_OK)):
         return jsonify({"error": "Invalid or unwritable save_path"}), 400
     
     try:
-        if not GITHUB_TOKEN:
-            raise ValueError("GitHub token is required")
-        repo_owner, repo_name = GITHUB_REPO.split("/")
-        HEADERS_REST["Authorization"] = f"token {GITHUB_TOKEN}"
-        HEADERS_GRAPHQL["Authorization"] = f"Bearer {GITHUB_TOKEN}"
+        config = DashboardConfig.from_args(request.args)
+        check_chart_format(fmt)
         
-        project_id = fetch_project_id()
-        sprints = fetch_project_sprints(project_id)
-        chart_data = compute_burndown_chart(sprint, sprints)
+        ctx = FetchContext()
+        prefetch_chart_tasks(config, sprint, ctx)
+        project_id = fetch_project_id(config, ctx)
+        sprints = fetch_project_sprints(config, project_id, ctx)
+        chart_data = compute_burndown_chart(config, sprint, sprints, ctx)
         if not chart_data:
             raise Exception("No chart data found")
         
-        current_date = datetime.now().date()
-        sprint_start, sprint_end = get_sprint_dates(sprint, sprints)
-        start_date = datetime.strptime(sprint_start, "%Y-%m-%d").date()
-        end_date = datetime.strptime(sprint_end, "%Y-%m-%d").date()
-        
-        # Generate dates for the full sprint duration, excluding weekends
-        dates = [start_date + timedelta(days=i) 
-                 for i in range((end_date - start_date).days + 1) 
-                 if (start_date + timedelta(days=i)).weekday() < 5]
-        initial_commitment = chart_data[0]["ideal_remaining"]
-        labels = [d.strftime("%Y-%m-%d") for d in dates]
-        
-        # Map chart_data to dates for easier lookup
-        chart_dict = {datetime.strptime(point["date"], "%Y-%m-%d").date(): point["actual_remaining"] 
-                      for point in chart_data}
-        
-        # Calculate open and closed points for each day
-        open_points = []
-        closed_points = []
-        cumulative_closed = 0
-        
-        for i, date in enumerate(dates):
-            actual_remaining = chart_dict.get(date, open_points[-1] if open_points else initial_commitment)
-            if i == 0:
-                daily_closed = max(initial_commitment - actual_remaining, 0)
-                open_points.append(actual_remaining)
-                closed_points.append(daily_closed)
-                cumulative_closed = daily_closed
-            else:
-                prev_open = open_points[i-1]
-                # Use actual_remaining directly up to current date, then hold steady
-                daily_closed = max(prev_open - actual_remaining, 0) if date <= current_date else 0
-                cumulative_closed += daily_closed
-                open_points.append(actual_remaining if date <= current_date else open_points[i-1])
-                closed_points.append(daily_closed)
-        
-        # Detect scope creep
-        scope_creep_detected = any(chart_data[i]["actual_remaining"] > (initial_commitment - sum(closed_points[:i+1]))
-                                  for i in range(len(chart_data)))
-        
-        # Calculate sprint completion
-        burned_points = sum(closed_points)
-        sprint_completion = (burned_points / initial_commitment * 100) if initial_commitment > 0 else 0
-        
-        # Create bar chart
-        fig = plt.figure(figsize=(12, 6))
-        try:
-            ax = plt.gca()
-            x = np.arange(len(labels))
-            width = 0.35
-            
-            ax.bar(x - width/2, open_points, width, label="Open Story Points", color="red", alpha=0.7)
-            ax.bar(x + width/2, closed_points, width, label="Closed Story Points", color="blue", alpha=0.7)
-            ax.plot(x, open_points, "r-", label="Open Points Trend", linewidth=1.5)
-            ax.plot(x, [sum(closed_points[:i+1]) for i in range(len(closed_points))], 
-                   "g--", label="Cumulative Closed", linewidth=2)
-            
-            ax.axvline(x=0, color="green", linestyle=":", label="Sprint Start")
-            ax.axvline(x=len(dates)-1, color="purple", linestyle=":", label="Sprint End")
-            ax.axvline(x=min([i for i, d in enumerate(dates) if d >= current_date], default=0), 
-                      color="gray", linestyle="--", label="Today", alpha=0.5)
-            ax.axhline(y=0, color="black", linestyle="-")
-            ax.axhline(y=initial_commitment, color="orange", linestyle="--", label="Initial Commitment", alpha=0.7)
-            
-            title = f"Burndown Chart - {sprint} (Completion: {sprint_completion:.1f}%)"
-            if scope_creep_detected:
-                title += " [Scope Creep Detected]"
-            ax.set_xlabel("Date")
-            ax.set_ylabel("Story Points")
-            ax.set_title(title)
-            ax.set_xticks(x)
-            ax.set_xticklabels(labels, rotation=45)
-            ax.legend(loc="best")
-            ax.grid(True, axis="y", linestyle="--", alpha=0.7)
-            plt.tight_layout()
-            
-            if save_path:
-                plt.savefig(save_path, format="png", bbox_inches="tight")
-                plt.close(fig)
-                return send_file(save_path, mimetype="image/png", as_attachment=True)
-            
-            img_io = BytesIO()
-            plt.savefig(img_io, format="png", bbox_inches="tight")
-            img_io.seek(0)
-            plt.close(fig)
-            return Response(img_io.getvalue(), mimetype="image/png")
-        except Exception as plot_error:
-            plt.close(fig)
-            raise Exception(f"Plotting error: {str(plot_error)}")
+        return chart_response(bar_chart_spec(burndown_metrics(chart_data), sprint), save_path, fmt)
     
     except ValueError as ve:
         return jsonify({"error": str(ve)}), 400
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
     except Exception as e:
         logger.error(f"Burndown chart image bars error: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 @app.route("/api/burndownchart_image", methods=["GET"])
 def burndown_chart_image():
-    global GITHUB_TOKEN, GITHUB_REPO, MILESTONE_TITLE, PROJECT_TITLE, repo_owner, repo_name
-    GITHUB_TOKEN = request.args.get("github_token", DEFAULT_GITHUB_TOKEN)
-    GITHUB_REPO = request.args.get("github_repo", DEFAULT_GITHUB_REPO)
-    MILESTONE_TITLE = request.args.get("milestone_title", DEFAULT_MILESTONE_TITLE)
-    PROJECT_TITLE = request.args.get("project_title", DEFAULT_PROJECT_TITLE)
     sprint = request.args.get("sprint", DEFAULT_SPRINT_NAME)
     save_path = request.args.get("save_path")
+    fmt = request.args.get("format", "png")
 
     try:
-        if not GITHUB_TOKEN:
-            raise ValueError("GitHub token is required")
-        repo_owner, repo_name = GITHUB_REPO.split("/")
-        HEADERS_REST["Authorization"] = f"token {GITHUB_TOKEN}"
-        HEADERS_GRAPHQL["Authorization"] = f"Bearer {GITHUB_TOKEN}"
-        project_id = fetch_project_id()
-        sprints = fetch_project_sprints(project_id)
-        chart = compute_burndown_chart(sprint, sprints)
-        dates = [datetime.strptime(point["date"], "%Y-%m-%d") for point in chart]
-        ideal = [point["ideal_remaining"] for point in chart]
-        actual = [point["actual_remaining"] for point in chart]
-
-        fig = plt.figure(figsize=(10, 6))
-        try:
-            plt.plot(dates, ideal, label="Ideal Burndown", marker="o", color="blue")
-            plt.plot(dates, actual, label="Actual Burndown", marker="o", color="red")
-            plt.xlabel("Date")
-            plt.ylabel("Remaining Story Points")
-            plt.title("Sprint Burndown Chart")
-            plt.legend()
-            plt.grid(True)
-            plt.gca().xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d"))
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-
-            if save_path:
-                plt.savefig(save_path, format="png", bbox_inches="tight")
-                plt.close(fig)
-                return send_file(save_path, mimetype="image/png", as_attachment=True)
-
-            img_io = BytesIO()
-            plt.savefig(img_io, format="png", bbox_inches="tight")
-            img_io.seek(0)
-            plt.close(fig)
-            return Response(img_io.getvalue(), mimetype="image/png")
-        except Exception as plot_error:
-            plt.close(fig)
-            raise Exception(f"Plotting error: {str(plot_error)}")
+        config = DashboardConfig.from_args(request.args)
+        check_chart_format(fmt)
+        ctx = FetchContext()
+        prefetch_chart_tasks(config, sprint, ctx)
+        project_id = fetch_project_id(config, ctx)
+        sprints = fetch_project_sprints(config, project_id, ctx)
+        chart = compute_burndown_chart(config, sprint, sprints, ctx)
+        return chart_response(line_chart_spec(burndown_metrics(chart)), save_path, fmt)
     
     except ValueError as ve:
         return jsonify({"error": str(ve)}), 400
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
     except Exception as e:
         logger.error(f"Burndown chart image error: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 @app.route("/api/burndownchart_image_detailed", methods=["GET"])
 def burndown_chart_image_detailed():
-    global GITHUB_TOKEN, GITHUB_REPO, MILESTONE_TITLE, PROJECT_TITLE, repo_owner, repo_name
-    GITHUB_TOKEN = request.args.get("github_token", DEFAULT_GITHUB_TOKEN)
-    GITHUB_REPO = request.args.get("github_repo", DEFAULT_GITHUB_REPO)
-    MILESTONE_TITLE = request.args.get("milestone_title", DEFAULT_MILESTONE_TITLE)
-    PROJECT_TITLE = request.args.get("project_title", DEFAULT_PROJECT_TITLE)
     sprint = request.args.get("sprint", DEFAULT_SPRINT_NAME)
     save_path = request.args.get("save_path")
+    fmt = request.args.get("format", "png")
 
     try:
-        if not GITHUB_TOKEN:
-            raise ValueError("GitHub token is required")
-        repo_owner, repo_name = GITHUB_REPO.split("/")
-        HEADERS_REST["Authorization"] = f"token {GITHUB_TOKEN}"
-        HEADERS_GRAPHQL["Authorization"] = f"Bearer {GITHUB_TOKEN}"
-        project_id = fetch_project_id()
-        sprints = fetch_project_sprints(project_id)
-        chart = compute_burndown_chart(sprint, sprints)
-
-        sprint_start, sprint_end = get_sprint_dates(sprint, sprints)
-        sprint_start_date = datetime.strptime(sprint_start, "%Y-%m-%d")
-        sprint_end_date = datetime.strptime(sprint_end, "%Y-%m-%d")
-        current_date = datetime.now()
-
-        dates = [datetime.strptime(point["date"], "%Y-%m-%d") for point in chart]
-        ideal = [point["ideal_remaining"] for point in chart]
-        actual = [point["actual_remaining"] for point in chart]
-
-        total_estimated_points = ideal[0] if ideal else 0
-        current_date_limit = min(current_date, sprint_end_date)
-        burned_points = 0
-        for i, date in enumerate(dates):
-            if date <= current_date_limit:
-                burned_points = total_estimated_points - actual[i]
-
-        sprint_completion = (burned_points / total_estimated_points * 100) if total_estimated_points > 0 else 0
-
-        actual_dates = [d for d in dates if d <= current_date_limit]
-        actual_limited = actual[:len(actual_dates)]
-
-        fig = plt.figure(figsize=(12, 7))
-        try:
-            ax = plt.gca()
-            plt.plot(dates, ideal, label="Ideal Burndown", marker="o", color="blue")
-            if actual_dates:
-                plt.plot(actual_dates, actual_limited, label="Actual Burndown", marker="o", color="red")
-
-            plt.xlabel("Date")
-            plt.ylabel("Remaining Story Points")
-            plt.title(f"Sprint Burndown Chart - {sprint}")
-            plt.grid(True, linestyle="--", alpha=0.7)
-
-            ax.xaxis.set_major_locator(mdates.DayLocator())
-            ax.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d"))
-            plt.xticks(rotation=45)
-
-            info_text = (f"Sprint Start: {sprint_start}\n"
-                        f"Sprint End: {sprint_end}\n"
-                        f"Completion: {sprint_completion:.1f}%")
-            plt.text(0.84, 0.95, info_text, transform=ax.transAxes, fontsize=10,
-                    verticalalignment='top', bbox=dict(boxstyle="round,pad=0.3", edgecolor="black", facecolor="white"))
-
-            plt.legend(loc="best")
-            plt.tight_layout()
-
-            if save_path:
-                plt.savefig(save_path, format="png", bbox_inches="tight")
-                plt.close(fig)
-                return send_file(save_path, mimetype="image/png", as_attachment=True)
-
-            img_io = BytesIO()
-            plt.savefig(img_io, format="png", bbox_inches="tight")
-            img_io.seek(0)
-            plt.close(fig)
-            return Response(img_io.getvalue(), mimetype="image/png")
-        except Exception as plot_error:
-            plt.close(fig)
-            raise Exception(f"Plotting error: {str(plot_error)}")
+        config = DashboardConfig.from_args(request.args)
+        check_chart_format(fmt)
+        ctx = FetchContext()
+        prefetch_chart_tasks(config, sprint, ctx)
+        project_id = fetch_project_id(config, ctx)
+        sprints = fetch_project_sprints(config, project_id, ctx)
+        chart = compute_burndown_chart(config, sprint, sprints, ctx)
+
+        sprint_start, sprint_end = get_sprint_dates(config, sprint, sprints, ctx)
+        return chart_response(detailed_chart_spec(burndown_metrics(chart), sprint, sprint_start, sprint_end), save_path, fmt)
     
     except ValueError as ve:
         return jsonify({"error": str(ve)}), 400
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
     except Exception as e:
         logger.error(f"Burndown chart image detailed error: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/dashboard", methods=["GET"])
+def api_dashboard():
+    sprint = request.args.get("sprint", DEFAULT_SPRINT_NAME)
+    try:
+        config = DashboardConfig.from_args(request.args)
+        ctx = FetchContext()
+        prefetch_chart_tasks(config, sprint, ctx)
+        project_id = fetch_project_id(config, ctx)
+        sprints = fetch_project_sprints(config, project_id, ctx)
+        chart = compute_burndown_chart(config, sprint, sprints, ctx)
+        if not chart:
+            raise Exception("No chart data found")
+
+        sprint_start, sprint_end = get_sprint_dates(config, sprint, sprints, ctx)
+        metrics = burndown_metrics(chart)
+        return jsonify({
+            "sprint": sprint,
+            "sprint_start": sprint_start,
+            "sprint_end": sprint_end,
+            "chart": chart,
+            "metrics": metrics,
+            "images": {
+                "line": chart_url(line_chart_spec(metrics)),
+                "bars": chart_url(bar_chart_spec(metrics, sprint)),
+                "detailed": chart_url(detailed_chart_spec(metrics, sprint, sprint_start, sprint_end))
+            }
+        })
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
+    except Exception as e:
+        logger.error(f"Dashboard error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/charts/<digest>.png", methods=["GET"])
+def chart_image(digest):
+    if not re.fullmatch(r"[0-9a-f]{64}", digest):
+        return jsonify({"error": "Unknown chart"}), 404
+    try:
+        if request.if_none_match.contains(digest):
+            response = Response(status=304)
+        else:
+            png = image_cache.get(digest)
+            if png is None:
+                spec = chart_specs.get(digest)
+                if spec is None:
+                    return jsonify({"error": "Chart expired, reload the dashboard"}), 404
+                png = chart_png(digest, spec)
+            response = Response(png, mimetype="image/png")
+        # The URL is derived from the chart contents, so it never changes meaning
+        response.set_etag(digest)
+        response.headers["Cache-Control"] = f"private, max-age={CHART_URL_TTL}"
+        return response
+    except Exception as e:
+        logger.error(f"Chart image error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 CONFIG_FILE = "user_config.json"
 
+@app.route("/api/history", methods=["GET"])
+def api_history():
+    """Recorded daily totals of a dashboard between start and end (YYYY-MM-DD), read without GitHub calls."""
+    try:
+        config = DashboardConfig.from_args(request.args)
+        end = date.fromisoformat(request.args["end"]) if request.args.get("end") else date.today()
+        start = date.fromisoformat(request.args["start"]) if request.args.get("start") else end - timedelta(days=30)
+        if start > end:
+            raise ValueError("start must not be after end")
+        days, scope, completed = burndown_history.read(dashboard_key(config), start.toordinal(), end.toordinal())
+        return jsonify({"days": [
+            {"date": date.fromordinal(int(day)).strftime("%Y-%m-%d"), "scope": int(day_scope),
+             "completed": int(day_completed), "remaining": max(int(day_scope) - int(day_completed), 0)}
+            for day, day_scope, day_completed in zip(days, scope, completed)
+        ]})
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        logger.error(f"History error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/ratelimit", methods=["GET"])
+def api_rate_limit():
+    """GitHub rate-limit budget and client counters of the worker answering the request."""
+    state = github.budget.state()
+    token = request.args.get("github_token")
+    if token:
+        state = [quota for quota in state if quota["token"] == token_fingerprint(token)]
+    return jsonify({"reserve": github.budget.reserve, "budgets": state, "client": github.stats()})
+
 @app.route("/api/config", methods=["GET"])
 def load_config():
     if os.path.exists(CONFIG_FILE):
@@ -794,6 +1320,185 @@ def save_config():
         logger.error(f"Save config error: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+# Repositories fetched at once by /api/portfolio
+PORTFOLIO_WORKERS = int(os.getenv("PORTFOLIO_WORKERS", "4"))
+
+def portfolio_repos(args):
+    if args.get("repos"):
+        return [repo.strip() for repo in args["repos"].split(",") if repo.strip()]
+    if os.path.exists(CONFIG_FILE):
+        with open(CONFIG_FILE, "r") as f:
+            return json.load(f).get("repos") or []
+    return []
+
+def portfolio_entry(config, repo, sprint):
+    """Burndown of one repository; failures are reported instead of failing the portfolio."""
+    try:
+        config = config.for_repo(repo)
+        ctx = FetchContext()
+        prefetch_chart_tasks(config, sprint, ctx)
+        project_id = fetch_project_id(config, ctx)
+        sprints = fetch_project_sprints(config, project_id, ctx)
+        return {"chart": compute_burndown_chart(config, sprint, sprints, ctx)}
+    except Exception as e:
+        logger.warning(f"Portfolio error for {repo}: {str(e)}")
+        return {"error": str(e)}
+
+@app.route("/api/portfolio", methods=["GET"])
+def api_portfolio():
+    sprint = request.args.get("sprint", DEFAULT_SPRINT_NAME)
+    try:
+        config = DashboardConfig.from_args(request.args)
+        repos = portfolio_repos(request.args)
+        if not repos:
+            raise ValueError("No repositories given; pass repos=owner/repo,... or save them as \"repos\" in the config")
+        repos = list(dict.fromkeys(repos))
+        with ThreadPoolExecutor(max_workers=min(PORTFOLIO_WORKERS, len(repos))) as executor:
+            entries = list(executor.map(lambda repo: portfolio_entry(config, repo, sprint), repos))
+        results = dict(zip(repos, entries))
+        return jsonify({
+            "sprint": sprint,
+            "repos": results,
+            "failed": [repo for repo, entry in results.items() if "error" in entry],
+            "combined": combine_burndowns([entry["chart"] for entry in entries if "chart" in entry])
+        })
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        logger.error(f"Portfolio error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+# GitHub webhooks (issues, projects_v2_item, milestone) keep the task store current without polling
+GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET")
+
+def verify_webhook_signature(body, signature):
+    if not GITHUB_WEBHOOK_SECRET or not signature:
+        return False
+    expected = "sha256=" + hmac.new(GITHUB_WEBHOOK_SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+def webhook_token():
+    """Token for the few lookups a webhook needs; the saved config's, else the environment's."""
+    if os.path.exists(CONFIG_FILE):
+        with open(CONFIG_FILE, "r") as f:
+            token = json.load(f).get("github_token")
+        if token:
+            return token
+    return DEFAULT_GITHUB_TOKEN
+
+def issue_event_item(issue, current):
+    """Task item updated from an issues event payload, keeping its project field values."""
+    repo, _, sprint, task = current
+    if "[Task]" not in issue["title"]:
+        return None
+    closed_at = issue.get("closed_at") if issue["state"] == "closed" else None
+    return (repo, (issue.get("milestone") or {}).get("number"), sprint, Task(
+        number=issue["number"],
+        state=issue["state"].upper(),
+        created_day=parse_day(issue["created_at"]),
+        closed_day=parse_day(closed_at) if closed_at else None,
+        points=task.points,
+        sprint=task.sprint
+    ))
+
+def webhook_item_update(event, payload, store):
+    """(content id, new item or None to drop it) for a store the event concerns, else None."""
+    if event == "issues" and store["repo"] == payload["repository"]["full_name"]:
+        issue = payload["issue"]
+        content_id = issue["node_id"]
+        if payload["action"] in ("deleted", "transferred"):
+            return content_id, None
+        if content_id in store["items"]:
+            return content_id, issue_event_item(issue, store["items"][content_id])
+        if "[Task]" not in issue["title"]:
+            return None
+    elif event == "projects_v2_item" and store["project_id"] == payload["projects_v2_item"]["project_node_id"]:
+        content_id = payload["projects_v2_item"]["content_node_id"]
+        if payload["action"] in ("deleted", "archived"):
+            return content_id, None
+    else:
+        return None
+    # New to the board, or a project field changed (the payload does not always carry the new value)
+    config = DashboardConfig(webhook_token(), store["repo"], None, None)
+    return content_id, fetch_task_items(config, store["project_id"], store["custom_fields"], [content_id])[content_id]
+
+def apply_webhook_event(event, payload):
+    """Apply one event to every task store and milestone snapshot it concerns; returns the stores changed."""
+    if event == "milestone":
+        # Snapshots and the resolution index map milestone titles to numbers; drop what used the old title
+        repo = payload["repository"]["full_name"]
+        for key in snapshot_cache.keys():
+            entry = snapshot_cache.get_entry(key, max_age=SNAPSHOT_CACHE_TTL + SNAPSHOT_MAX_STALE)
+            if entry is None or entry[0].get("milestone_number") != payload["milestone"]["number"]:
+                continue
+            store = task_store.get(entry[0].get("task_store_key") or "")
+            if store is not None and store.get("repo") == repo:
+                snapshot_cache.delete(key)
+        for key in resolution_index.keys():
+            with resolution_index.lock(key):
+                index = resolution_index.get(key)
+                if index is None or index.get("repo") != repo:
+                    continue
+                milestones = {title: entry for title, entry in index.get("milestones", {}).items()
+                              if entry[0] != payload["milestone"]["number"]}
+                resolution_index.set(key, dict(index, milestones=milestones))
+        return 0
+
+    changed = 0
+    for key in task_store.keys():
+        with task_store.lock(key):
+            store = task_store.get(key)
+            if store is None or "repo" not in store:
+                continue
+            update = webhook_item_update(event, payload, store)
+            if update is None:
+                continue
+            content_id, item = update
+            items = dict(store["items"])
+            if item is None:
+                if items.pop(content_id, None) is None:
+                    continue
+            else:
+                items[content_id] = item
+            task_store.set(key, dict(store, items=items))
+            rebuild_milestone_snapshots(key, store["repo"], items)
+            changed += 1
+    return changed
+
+def rebuild_milestone_snapshots(store_key, repo, items):
+    """Recompute the cached milestone snapshots built from a task store, without GitHub calls.
+
+    Rendered charts need no invalidation: they are addressed by their data, so the
+    new snapshot yields new chart digests and ETags.
+    """
+    for key in snapshot_cache.keys():
+        entry = snapshot_cache.get_entry(key, max_age=SNAPSHOT_CACHE_TTL + SNAPSHOT_MAX_STALE)
+        if entry is None or entry[0].get("task_store_key") != store_key:
+            continue
+        snapshot = entry[0]
+        snapshot = milestone_snapshot(store_key, repo, snapshot["milestone_number"], snapshot["custom_fields"],
+                                      items.values())
+        snapshot_cache.set(key, snapshot)
+        record_history(key, snapshot["tasks"])
+
+@app.route("/api/webhook", methods=["POST"])
+def github_webhook():
+    if not GITHUB_WEBHOOK_SECRET:
+        return jsonify({"error": "Webhook secret is not configured"}), 403
+    if not verify_webhook_signature(request.get_data(), request.headers.get("X-Hub-Signature-256")):
+        return jsonify({"error": "Invalid signature"}), 401
+    event = request.headers.get("X-GitHub-Event")
+    if event == "ping":
+        return jsonify({"message": "pong"})
+    if event not in ("issues", "projects_v2_item", "milestone"):
+        return jsonify({"message": f"Ignored event '{event}'"}), 202
+    try:
+        changed = apply_webhook_event(event, request.get_json())
+        return jsonify({"event": event, "updated_stores": changed})
+    except Exception as e:
+        logger.error(f"Webhook error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route("/ui")
 def ui():
     try:
@@ -810,4 +1515,5 @@ def ui():
         return f"Error rendering UI: {str(e)}", 500
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,328 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows builds run a single process, thread coalescing is enough there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "dashboards-cache")
+
+
+def token_fingerprint(token):
+    """Short, non-reversible identifier for a token so cache keys never hold secrets."""
+    return hashlib.sha256((token or "").encode("utf-8")).hexdigest()[:16]
+
+
+def cache_key(*parts):
+    return hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock shared by every process on the host that opens the same path."""
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def try_file_lock(path):
+    """Non-blocking file_lock: yields False instead of waiting when someone else holds it."""
+    if fcntl is None:
+        yield True
+        return
+    with open(path, "a") as f:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = fn()
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+class SnapshotCache:
+    """TTL + LRU cache of snapshots, stored as JSON (through optional encode/decode hooks).
+
+    Entries live as files in a local directory so every gunicorn worker on the host
+    shares them; a small in-memory copy skips re-reading a file that has not been
+    replaced since it was last loaded. Writes go through a temp file and os.replace,
+    so readers never see a partial entry. Recency is tracked with the file atime
+    (set explicitly, so noatime mounts still work) and the least recently used files
+    are removed once the directory holds more than max_entries.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=300, max_entries=64, namespace="snapshots",
+                 encode=None, decode=None):
+        self.directory = os.path.join(directory, namespace)
+        self.encode = encode or (lambda value: value)
+        self.decode = decode or (lambda value: value)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        os.makedirs(os.path.join(self.directory, "locks"), mode=0o700, exist_ok=True)
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_entries > 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, key, max_age=None):
+        """(value, stored_at) if the entry is at most max_age (default: ttl) seconds old, else None.
+
+        A max_age above ttl lets callers serve stale data while it is being refreshed.
+        """
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._memory.pop(key, None)
+            return None
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] != (stat.st_ino, stat.st_mtime_ns):
+                entry = None
+            if entry is not None:
+                self._memory.move_to_end(key)
+
+        if entry is None:
+            try:
+                with open(path, "r") as f:
+                    stored = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Discarding unreadable cache entry {path}: {str(e)}")
+                self.delete(key)
+                return None
+            entry = ((stat.st_ino, stat.st_mtime_ns), stored["stored_at"], self.decode(stored["value"]))
+            self._remember(key, entry)
+
+        _, stored_at, value = entry
+        if time.time() - stored_at > (self.ttl if max_age is None else max_age):
+            return None
+        try:
+            os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+        except OSError:
+            pass
+        return value, stored_at
+
+    def get_or_load(self, key, loader):
+        """Return the cached value, or load it once for all concurrent callers.
+
+        Threads of this worker wait on the in-flight call; other workers block on the
+        key's lock file and then find the leader's result in the cache.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        return self._flights.do(key, lambda: self._load_locked(key, loader))
+
+    def lock(self, key):
+        """Host-wide lock for read-modify-write updates of one entry."""
+        return file_lock(os.path.join(self.directory, "locks", f"{key}.lock"))
+
+    def _load_locked(self, key, loader):
+        with self.lock(key):
+            value = self.get(key)
+            if value is None:
+                value = loader()
+                self.set(key, value)
+            return value
+
+    def refresh(self, key, loader):
+        """Load and store the value even if the cached one is still fresh."""
+        def load():
+            with self.lock(key):
+                value = loader()
+                self.set(key, value)
+                return value
+        return self._flights.do(key, load)
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        path = self._path(key)
+        stored_at = time.time()
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"stored_at": stored_at, "value": self.encode(value)}, f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        stat = os.stat(path)
+        self._remember(key, ((stat.st_ino, stat.st_mtime_ns), stored_at, value))
+        self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            self._memory.pop(key, None)
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def keys(self):
+        return [name[:-len(".json")] for name in os.listdir(self.directory) if name.endswith(".json")]
+
+    def clear(self):
+        for key in self.keys():
+            self.delete(key)
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                entries.append((os.stat(os.path.join(self.directory, name)).st_atime, name))
+            except FileNotFoundError:
+                continue
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, name in entries[:len(entries) - self.max_entries]:
+            self.delete(name[:-len(".json")])
+
+
+class BlobCache:
+    """Size-bounded store of immutable blobs (e.g. rendered charts) keyed by a content digest.
+
+    Shared by all workers through a local directory; least recently used files are
+    evicted once their total size exceeds max_bytes.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=64 * 1024 * 1024, namespace="images", suffix=".bin"):
+        self.directory = os.path.join(directory, namespace)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def get(self, key):
+        if self.max_bytes <= 0:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+        except FileNotFoundError:
+            return None
+        return data
+
+    def set(self, key, data):
+        if self.max_bytes <= 0 or len(data) > self.max_bytes:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._evict()
+
+    def delete(self, key):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.suffix):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, name))
+            total += stat.st_size
+        entries.sort()
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            self.delete(name[:-len(self.suffix)])
+            total -= size
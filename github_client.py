@@ -0,0 +1,403 @@
+import asyncio
+import json
+import logging
+import math
+import random
+import threading
+import time
+from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from cache import cache_key, token_fingerprint
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {500, 502, 503, 504}
+
+
+class RateLimitExceeded(Exception):
+    """GitHub's quota for a token is used up until reset_at (epoch seconds)."""
+
+    def __init__(self, message, reset_at):
+        super().__init__(message)
+        self.reset_at = reset_at
+
+    @property
+    def retry_after(self):
+        return max(int(math.ceil(self.reset_at - time.time())), 0)
+
+
+def _request_token(headers):
+    """Token of an Authorization header, whatever its scheme ("token x", "Bearer x")."""
+    authorization = (headers or {}).get("Authorization") or ""
+    return authorization.split(" ")[-1]
+
+
+class RateLimitBudget:
+    """Remaining GitHub quota per token and resource (core, graphql, ...).
+
+    Updated from the X-RateLimit-* headers of every response, Retry-After on secondary
+    limits, and the GraphQL rateLimit object when a query asks for it. A resource is
+    low once less than `reserve` of its limit is left, and exhausted at zero; both
+    clear when its reset time passes. Tokens are only kept as fingerprints.
+    """
+
+    def __init__(self, reserve=0.1):
+        self.reserve = reserve
+        self._lock = threading.Lock()
+        self._quotas = {}
+
+    def _quota(self, token, resource):
+        return self._quotas.setdefault((token_fingerprint(token), resource), {
+            "limit": None, "remaining": None, "reset_at": None, "blocked_until": None,
+            "graphql_cost": 0, "rate_limited": 0
+        })
+
+    def record(self, token, resource, response):
+        headers = response.headers
+        with self._lock:
+            quota = self._quota(token, headers.get("X-RateLimit-Resource", resource))
+            if "X-RateLimit-Remaining" in headers:
+                try:
+                    quota["limit"] = int(headers.get("X-RateLimit-Limit", quota["limit"] or 0))
+                    quota["remaining"] = int(headers["X-RateLimit-Remaining"])
+                    quota["reset_at"] = int(headers.get("X-RateLimit-Reset", quota["reset_at"] or 0))
+                except ValueError:
+                    pass
+            if response.status_code in (403, 429) and "Retry-After" in headers:
+                try:
+                    quota["blocked_until"] = time.time() + float(headers["Retry-After"])
+                except ValueError:
+                    pass
+            if response.status_code in (403, 429) and (quota["remaining"] == 0 or quota["blocked_until"]):
+                quota["rate_limited"] += 1
+
+    def record_graphql(self, token, rate_limit):
+        """Account for a GraphQL `rateLimit { cost limit remaining resetAt }` selection."""
+        if not rate_limit:
+            return
+        with self._lock:
+            quota = self._quota(token, "graphql")
+            quota["graphql_cost"] += rate_limit.get("cost") or 0
+            if rate_limit.get("limit"):
+                quota["limit"] = rate_limit["limit"]
+            if rate_limit.get("remaining") is not None:
+                quota["remaining"] = rate_limit["remaining"]
+            if rate_limit.get("resetAt"):
+                quota["reset_at"] = int(datetime.fromisoformat(rate_limit["resetAt"].replace("Z", "+00:00")).timestamp())
+
+    def exhausted_until(self, token, resource):
+        """Epoch seconds until which the resource is used up for the token, or None."""
+        now = time.time()
+        with self._lock:
+            quota = self._quotas.get((token_fingerprint(token), resource))
+            if quota is None:
+                return None
+            if quota["blocked_until"] and quota["blocked_until"] > now:
+                return quota["blocked_until"]
+            if quota["remaining"] == 0 and quota["reset_at"] and quota["reset_at"] > now:
+                return quota["reset_at"]
+        return None
+
+    def is_low(self, token, resource=None):
+        """True while any (or the given) resource of the token is below its reserve."""
+        fingerprint = token_fingerprint(token)
+        with self._lock:
+            return any(self._is_low(quota) for (quota_token, quota_resource), quota in self._quotas.items()
+                       if quota_token == fingerprint and resource in (None, quota_resource))
+
+    def _is_low(self, quota):
+        now = time.time()
+        if quota["blocked_until"] and quota["blocked_until"] > now:
+            return True
+        if quota["remaining"] is None or (quota["reset_at"] and quota["reset_at"] <= now):
+            return False
+        return quota["remaining"] == 0 or bool(quota["limit"]) and quota["remaining"] < self.reserve * quota["limit"]
+
+    def state(self):
+        """Current quota of every token fingerprint and resource seen so far."""
+        with self._lock:
+            return [dict(quota, token=fingerprint, resource=resource, low=self._is_low(quota))
+                    for (fingerprint, resource), quota in self._quotas.items()]
+
+
+class CachedResponse:
+    """Stands in for a 304 Not Modified, carrying the locally stored body."""
+
+    status_code = 200
+    from_cache = True
+
+    def __init__(self, data, headers, link=None):
+        self._data = data
+        self.headers = headers
+        self._link = link
+
+    def json(self):
+        return self._data
+
+    @property
+    def links(self):
+        """Pagination links of the stored response, like requests.Response.links."""
+        if not self._link:
+            return {}
+        return {link.get("rel") or link["url"]: link for link in requests.utils.parse_header_links(self._link)}
+
+    @property
+    def text(self):
+        return json.dumps(self._data)
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter that counts whether each request opened a socket or reused a kept-alive one."""
+
+    def __init__(self, *args, **kwargs):
+        self.new_connections = 0
+        self.reused_connections = 0
+        self._count_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        adapter = self
+        pool_classes = {}
+        for scheme, pool_cls in self.poolmanager.pool_classes_by_scheme.items():
+            class CountingPool(pool_cls):
+                def _make_request(self, conn, *args, **kwargs):
+                    adapter._record(conn.sock is None)
+                    return super()._make_request(conn, *args, **kwargs)
+            pool_classes[scheme] = CountingPool
+        self.poolmanager.pool_classes_by_scheme = pool_classes
+
+    def _record(self, new_connection):
+        with self._count_lock:
+            if new_connection:
+                self.new_connections += 1
+            else:
+                self.reused_connections += 1
+
+
+class GitHubClient:
+    """Pooled keep-alive HTTP client for the GitHub REST and GraphQL APIs.
+
+    Every call gets connect/read timeouts so a slow upstream cannot pin a worker,
+    and 5xx or secondary-rate-limit responses are retried a bounded number of times
+    with jittered exponential backoff (or the server's Retry-After, when it is short
+    enough to wait for).
+
+    When a validator_store (a cache.SnapshotCache) is given, get_conditional keeps
+    ETag/Last-Modified validators next to the parsed body and revalidates with
+    If-None-Match/If-Modified-Since; GitHub does not bill 304s against the rate limit.
+
+    Every response updates `budget` (a RateLimitBudget). Requests for a token whose
+    quota is used up raise RateLimitExceeded without reaching GitHub, as do primary
+    rate-limit responses and secondary ones asking for a longer wait than backoff_max.
+    """
+
+    def __init__(self, api_url="https://api.github.com", graphql_url=None,
+                 connect_timeout=5, read_timeout=30, max_retries=3,
+                 backoff_base=0.5, backoff_max=10, pool_size=10, validator_store=None, budget=None):
+        self.api_url = api_url.rstrip("/")
+        self.graphql_url = graphql_url or f"{self.api_url}/graphql"
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        self._adapter = _CountingAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+        self.validator_store = validator_store
+        self.budget = budget or RateLimitBudget()
+        self._lock = threading.Lock()
+        self._retries = 0
+        self._not_modified = 0
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def get_conditional(self, url, headers=None):
+        """GET a REST resource, answering from the stored copy when GitHub replies 304."""
+        if self.validator_store is None:
+            return self.get(url, headers=headers)
+        headers = dict(headers or {})
+        key = cache_key(url, token_fingerprint(headers.get("Authorization")))
+        stored = self.validator_store.get(key)
+        if stored is not None:
+            if stored.get("etag"):
+                headers["If-None-Match"] = stored["etag"]
+            if stored.get("last_modified"):
+                headers["If-Modified-Since"] = stored["last_modified"]
+
+        response = self.get(url, headers=headers)
+        if response.status_code == 304 and stored is not None:
+            with self._lock:
+                self._not_modified += 1
+            return CachedResponse(stored["body"], response.headers, stored.get("link"))
+        if response.status_code == 200:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                self.validator_store.set(key, {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "link": response.headers.get("Link"),
+                    "body": response.json()
+                })
+        return response
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        token = _request_token(kwargs.get("headers"))
+        resource = "graphql" if url == self.graphql_url else "core"
+        attempt = 0
+        while True:
+            reset_at = self.budget.exhausted_until(token, resource)
+            if reset_at is not None:
+                wait = reset_at - time.time()
+                if wait > self.backoff_max:
+                    raise RateLimitExceeded(f"GitHub {resource} rate limit exhausted, resets in {int(wait)}s", reset_at)
+                time.sleep(max(wait, 0))
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"GitHub {method} {url} failed ({str(e)}), retrying in {delay:.2f}s")
+            else:
+                self.budget.record(token, resource, response)
+                delay = self._retry_delay(response, attempt)
+                if delay is None:
+                    reset_at = self.budget.exhausted_until(token, resource) if response.status_code in (403, 429) else None
+                    if reset_at is not None:
+                        # Out of retries, or told to wait longer than backoff_max
+                        response.close()
+                        raise RateLimitExceeded(f"GitHub {resource} rate limit exceeded, resets in "
+                                                f"{max(int(reset_at - time.time()), 0)}s", reset_at)
+                    return response
+                logger.warning(f"GitHub {method} {url} returned {response.status_code}, retrying in {delay:.2f}s")
+                response.close()
+            with self._lock:
+                self._retries += 1
+            time.sleep(delay)
+            attempt += 1
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_delay(self, response, attempt):
+        """Seconds to wait before retrying, or None if the response should be returned as is."""
+        if attempt >= self.max_retries:
+            return None
+        if response.status_code in RETRY_STATUSES:
+            return self._backoff(attempt)
+        if response.status_code in (403, 429) and self._is_secondary_rate_limit(response):
+            retry_after = response.headers.get("Retry-After")
+            if retry_after is None:
+                return self._backoff(attempt)
+            try:
+                retry_after = float(retry_after)
+            except ValueError:
+                return None
+            return retry_after if retry_after <= self.backoff_max else None
+        return None
+
+    @staticmethod
+    def _is_secondary_rate_limit(response):
+        if "Retry-After" in response.headers:
+            return True
+        return "secondary rate limit" in response.text.lower()
+
+    def stats(self):
+        """Request counters, split into fresh and reused keep-alive connections."""
+        new_connections = self._adapter.new_connections
+        reused_connections = self._adapter.reused_connections
+        return {
+            "requests": new_connections + reused_connections,
+            "new_connections": new_connections,
+            "reused_connections": reused_connections,
+            "retries": self._retries,
+            "not_modified": self._not_modified
+        }
+
+
+def _page_url(url, page):
+    parts = urlsplit(url)
+    query = [(name, value) for name, value in parse_qsl(parts.query) if name != "page"]
+    return urlunsplit(parts._replace(query=urlencode(query + [("page", str(page))])))
+
+
+class AsyncGitHubClient:
+    """asyncio front end for a GitHubClient, so independent GitHub calls overlap.
+
+    Calls run on worker threads of the event loop's default executor, over the wrapped
+    client's keep-alive pool, which keeps its timeouts, retries and validator store.
+    `concurrency` bounds the pages get_all_pages requests at once; call and parallel
+    are not limited beyond the executor. The sync facade (run, parallel) lets blocking
+    code such as Flask views use it.
+    """
+
+    def __init__(self, client, concurrency=8):
+        self.client = client
+        self.concurrency = concurrency
+
+    async def call(self, fn, *args, **kwargs):
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    async def get(self, url, **kwargs):
+        return await self.call(self.client.get, url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.call(self.client.post, url, **kwargs)
+
+    async def get_conditional(self, url, headers=None):
+        return await self.call(self.client.get_conditional, url, headers=headers)
+
+    async def get_all_pages(self, url, headers=None, conditional=True):
+        """Responses for every page of a REST list.
+
+        Once the first page's Link header names the last page, the remaining pages
+        are requested concurrently, one at a time while the token's rate-limit budget
+        is low so an exhausted quota stops the walk early. Stops at the first response
+        that is not a 200. conditional=False skips the validator store, for one-off URLs.
+        """
+        async def get_page(page_url):
+            if conditional:
+                return await self.get_conditional(page_url, headers)
+            return await self.get(page_url, headers=headers)
+
+        first = await get_page(url)
+        last = first.links.get("last") if first.status_code == 200 else None
+        if not last:
+            return [first]
+        last_page = int(dict(parse_qsl(urlsplit(last["url"]).query)).get("page", 1))
+        low = self.client.budget.is_low(_request_token(headers), "core")
+        slots = asyncio.Semaphore(1 if low else self.concurrency)
+
+        async def fetch(page):
+            async with slots:
+                return await get_page(_page_url(last["url"], page))
+
+        rest = await asyncio.gather(*(fetch(page) for page in range(2, last_page + 1)))
+        responses = [first]
+        for response in rest:
+            responses.append(response)
+            if response.status_code != 200:
+                break
+        return responses
+
+    def run(self, coroutine):
+        """Run a coroutine to completion from blocking code."""
+        return asyncio.run(coroutine)
+
+    def parallel(self, *calls):
+        """Run blocking zero-argument callables concurrently and return their results in order."""
+        async def run_all():
+            return await asyncio.gather(*(self.call(fn) for fn in calls))
+        return self.run(run_all())
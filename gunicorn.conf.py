@@ -0,0 +1,8 @@
+# Loaded by start.sh; command-line flags there set the worker layout
+
+
+def post_worker_init(worker):
+    # Spawn and warm the chart render processes as the worker starts, so its first
+    # chart request does not pay for importing matplotlib and building the font cache
+    from app import render_pool
+    render_pool.start()
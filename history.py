@@ -0,0 +1,73 @@
+import logging
+import os
+
+import numpy as np
+
+from cache import DEFAULT_CACHE_DIR, file_lock
+
+logger = logging.getLogger(__name__)
+
+# One fixed-width record per day: ordinal day, story points in scope, story points completed
+RECORD = np.dtype([("day", "<i8"), ("scope", "<i8"), ("completed", "<i8")])
+
+
+class BurndownHistory:
+    """Daily scope/completed story point totals of each dashboard, one append-only file per key.
+
+    Records are 24 bytes and appended in day order, so a range of days is found by
+    binary search over a memory map and read in O(days). The record of the current
+    day is rewritten in place while the day lasts; once a later day is appended it
+    is frozen, so later re-estimates or tasks leaving the milestone do not change it.
+    Files are shared by all workers on the host through a lock file per key.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, namespace="history"):
+        self.directory = os.path.join(directory, namespace)
+        os.makedirs(os.path.join(self.directory, "locks"), mode=0o700, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.days")
+
+    def record(self, key, day, scope, completed):
+        """Store the totals of `day`; days before the last recorded one are left untouched."""
+        path = self._path(key)
+        with file_lock(os.path.join(self.directory, "locks", f"{key}.lock")):
+            with os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o600), "r+b") as f:
+                size = f.seek(0, os.SEEK_END)
+                if size % RECORD.itemsize:
+                    # A write cut short by a crash; drop the partial record
+                    size -= size % RECORD.itemsize
+                    f.truncate(size)
+                if size:
+                    f.seek(size - RECORD.itemsize)
+                    last = np.frombuffer(f.read(RECORD.itemsize), dtype=RECORD)[0]
+                    if day < last["day"] or (day == last["day"] and (scope, completed) == (last["scope"], last["completed"])):
+                        return
+                    if day == last["day"]:
+                        # Rewritten in place: readers size their map without the lock, so the file never shrinks
+                        size -= RECORD.itemsize
+                f.seek(size)
+                f.write(np.array([(day, scope, completed)], dtype=RECORD).tobytes())
+
+    def read(self, key, start_day, end_day):
+        """(days, scope, completed) arrays of the recorded days in [start_day, end_day]."""
+        try:
+            size = os.path.getsize(self._path(key))
+        except FileNotFoundError:
+            size = 0
+        count = size // RECORD.itemsize
+        if count == 0 or end_day < start_day:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        records = np.memmap(self._path(key), dtype=RECORD, mode="r", shape=(count,))
+        first = int(np.searchsorted(records["day"], start_day, side="left"))
+        last = int(np.searchsorted(records["day"], end_day, side="right"))
+        window = np.array(records[first:last])
+        del records
+        return window["day"], window["scope"], window["completed"]
+
+    def delete(self, key):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
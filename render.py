@@ -0,0 +1,422 @@
+import logging
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+
+# Bump whenever the drawing code changes, so cached renders are not reused
+CHART_STYLE_VERSION = 1
+
+
+class RenderQueueFull(Exception):
+    pass
+
+
+# Chart specs: plain, picklable data describing one chart
+def line_chart_spec(metrics):
+    return {
+        "variant": "line",
+        "dates": metrics["dates"],
+        "ideal": metrics["ideal_remaining"],
+        "actual": metrics["actual_remaining"]
+    }
+
+
+def bar_chart_spec(metrics, sprint):
+    title = f"Burndown Chart - {sprint} (Completion: {metrics['sprint_completion']:.1f}%)"
+    if metrics["scope_creep_detected"]:
+        title += " [Scope Creep Detected]"
+    return {
+        "variant": "bars",
+        "title": title,
+        "labels": metrics["working_days"],
+        "open_points": metrics["open_points"],
+        "closed_points": metrics["closed_points"],
+        "cumulative_closed": metrics["cumulative_closed"],
+        "today_index": metrics["today_index"],
+        "initial_commitment": metrics["initial_commitment"]
+    }
+
+
+def detailed_chart_spec(metrics, sprint, sprint_start, sprint_end):
+    elapsed = metrics["elapsed_days"]
+    return {
+        "variant": "detailed",
+        "title": f"Sprint Burndown Chart - {sprint}",
+        "dates": metrics["dates"],
+        "ideal": metrics["ideal_remaining"],
+        "actual_dates": metrics["dates"][:elapsed],
+        "actual": metrics["actual_remaining"][:elapsed],
+        "info": (f"Sprint Start: {sprint_start}\n"
+                 f"Sprint End: {sprint_end}\n"
+                 f"Completion: {metrics['completion_to_date']:.1f}%")
+    }
+
+
+# Rendering; runs inside the pool processes
+def _parse_dates(days):
+    return [datetime.strptime(day, "%Y-%m-%d") for day in days]
+
+
+def _draw_line(fig, spec):
+    import matplotlib.dates as mdates
+    ax = fig.add_subplot()
+    dates = _parse_dates(spec["dates"])
+    ax.plot(dates, spec["ideal"], label="Ideal Burndown", marker="o", color="blue")
+    ax.plot(dates, spec["actual"], label="Actual Burndown", marker="o", color="red")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Remaining Story Points")
+    ax.set_title("Sprint Burndown Chart")
+    ax.legend()
+    ax.grid(True)
+    ax.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d"))
+    ax.tick_params(axis="x", labelrotation=45)
+
+
+def _draw_bars(fig, spec):
+    import numpy as np
+    ax = fig.add_subplot()
+    labels = spec["labels"]
+    x = np.arange(len(labels))
+    width = 0.35
+
+    ax.bar(x - width/2, spec["open_points"], width, label="Open Story Points", color="red", alpha=0.7)
+    ax.bar(x + width/2, spec["closed_points"], width, label="Closed Story Points", color="blue", alpha=0.7)
+    ax.plot(x, spec["open_points"], "r-", label="Open Points Trend", linewidth=1.5)
+    ax.plot(x, spec["cumulative_closed"], "g--", label="Cumulative Closed", linewidth=2)
+
+    ax.axvline(x=0, color="green", linestyle=":", label="Sprint Start")
+    ax.axvline(x=len(labels)-1, color="purple", linestyle=":", label="Sprint End")
+    ax.axvline(x=spec["today_index"], color="gray", linestyle="--", label="Today", alpha=0.5)
+    ax.axhline(y=0, color="black", linestyle="-")
+    ax.axhline(y=spec["initial_commitment"], color="orange", linestyle="--", label="Initial Commitment", alpha=0.7)
+
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Story Points")
+    ax.set_title(spec["title"])
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels, rotation=45)
+    ax.legend(loc="best")
+    ax.grid(True, axis="y", linestyle="--", alpha=0.7)
+
+
+def _draw_detailed(fig, spec):
+    import matplotlib.dates as mdates
+    ax = fig.add_subplot()
+    ax.plot(_parse_dates(spec["dates"]), spec["ideal"], label="Ideal Burndown", marker="o", color="blue")
+    if spec["actual_dates"]:
+        ax.plot(_parse_dates(spec["actual_dates"]), spec["actual"], label="Actual Burndown", marker="o", color="red")
+
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Remaining Story Points")
+    ax.set_title(spec["title"])
+    ax.grid(True, linestyle="--", alpha=0.7)
+
+    ax.xaxis.set_major_locator(mdates.DayLocator())
+    ax.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d"))
+    ax.tick_params(axis="x", labelrotation=45)
+
+    ax.text(0.84, 0.95, spec["info"], transform=ax.transAxes, fontsize=10,
+            verticalalignment="top", bbox=dict(boxstyle="round,pad=0.3", edgecolor="black", facecolor="white"))
+    ax.legend(loc="best")
+
+
+CHART_VARIANTS = {
+    "line": ((10, 6), _draw_line),
+    "bars": ((12, 6), _draw_bars),
+    "detailed": ((12, 7), _draw_detailed),
+}
+
+
+def render_png(spec):
+    """Render a chart spec to PNG bytes with the object-oriented Figure API (no pyplot state)."""
+    from matplotlib.figure import Figure
+    figsize, draw = CHART_VARIANTS[spec["variant"]]
+    fig = Figure(figsize=figsize)
+    draw(fig, spec)
+    fig.tight_layout()
+    img_io = BytesIO()
+    fig.savefig(img_io, format="png", bbox_inches="tight")
+    return img_io.getvalue()
+
+
+# Native SVG output; plain string building, so it never loads matplotlib
+SVG_DPI = 100
+SVG_DASHES = {"-": None, "--": "6,4", ":": "2,3"}
+
+
+def _nice_step(span, target=6):
+    raw = span / target
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for multiple in (1, 2, 2.5, 5, 10):
+        if raw <= multiple * magnitude:
+            return multiple * magnitude
+
+
+def _number(value):
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+
+class _SvgPlot:
+    """Single-axes SVG plot with matplotlib-like styling, over category positions 0..count-1."""
+
+    MARGIN = (70, 30, 50, 100)  # left, right, top, bottom
+
+    def __init__(self, figsize, count, values, title, xlabel, ylabel):
+        self.width, self.height = figsize[0] * SVG_DPI, figsize[1] * SVG_DPI
+        left, right, top, bottom = self.MARGIN
+        self.left, self.right = left, self.width - right
+        self.top, self.bottom = top, self.height - bottom
+        self.count = max(count, 1)
+        low, high = min([0] + list(values)), max([1] + list(values))
+        self.step = _nice_step(high - low)
+        self.low = math.floor(low / self.step) * self.step
+        self.high = math.ceil(high * 1.05 / self.step) * self.step
+        self.title, self.xlabel, self.ylabel = title, xlabel, ylabel
+        self.parts = []
+        self.legend = []
+        self.boxes = []
+
+    def x(self, index):
+        return round(self.left + (index + 0.5) / self.count * (self.right - self.left), 2)
+
+    def y(self, value):
+        return round(self.bottom - (value - self.low) / (self.high - self.low) * (self.bottom - self.top), 2)
+
+    @staticmethod
+    def _stroke(color, linestyle="-", width=2, alpha=1):
+        attrs = f'stroke="{color}" stroke-width="{width}"'
+        if SVG_DASHES[linestyle]:
+            attrs += f' stroke-dasharray="{SVG_DASHES[linestyle]}"'
+        if alpha < 1:
+            attrs += f' stroke-opacity="{alpha}"'
+        return attrs
+
+    def grid(self, x=True, linestyle="-", alpha=0.3):
+        stroke = self._stroke("#b0b0b0", linestyle, 1, alpha)
+        value = self.low
+        while value <= self.high + 1e-9:
+            self.parts.append(f'<line x1="{self.left}" x2="{self.right}" y1="{self.y(value)}" y2="{self.y(value)}" {stroke}/>')
+            value += self.step
+        if x:
+            for index in range(self.count):
+                self.parts.append(f'<line x1="{self.x(index)}" x2="{self.x(index)}" y1="{self.top}" y2="{self.bottom}" {stroke}/>')
+
+    def line(self, values, color, label=None, linestyle="-", width=2, markers=False, offset=0):
+        if not values:
+            return
+        points = " ".join(f"{self.x(index + offset)},{self.y(value)}" for index, value in enumerate(values))
+        self.parts.append(f'<polyline points="{points}" fill="none" {self._stroke(color, linestyle, width)}/>')
+        if markers:
+            for index, value in enumerate(values):
+                self.parts.append(f'<circle cx="{self.x(index + offset)}" cy="{self.y(value)}" r="3.5" fill="{color}"/>')
+        if label:
+            self.legend.append(("line", color, linestyle, label))
+
+    def bars(self, values, color, label, shift, alpha=0.7):
+        slot = (self.right - self.left) / self.count
+        width = round(slot * 0.35, 2)
+        for index, value in enumerate(values):
+            x = round(self.x(index) + shift * slot - width / 2, 2)
+            y = min(self.y(value), self.y(0))
+            height = round(abs(self.y(0) - self.y(value)), 2)
+            self.parts.append(f'<rect x="{x}" y="{y}" width="{width}" height="{height}" fill="{color}" fill-opacity="{alpha}"/>')
+        self.legend.append(("bar", color, "-", label))
+
+    def vline(self, index, color, label=None, linestyle="-", alpha=1):
+        x = self.x(index)
+        self.parts.append(f'<line x1="{x}" x2="{x}" y1="{self.top}" y2="{self.bottom}" {self._stroke(color, linestyle, 1.5, alpha)}/>')
+        if label:
+            self.legend.append(("line", color, linestyle, label))
+
+    def hline(self, value, color, label=None, linestyle="-", alpha=1):
+        y = self.y(value)
+        self.parts.append(f'<line x1="{self.left}" x2="{self.right}" y1="{y}" y2="{y}" {self._stroke(color, linestyle, 1.5, alpha)}/>')
+        if label:
+            self.legend.append(("line", color, linestyle, label))
+
+    def text_box(self, lines):
+        self.boxes.append(lines)
+
+    def _box(self, y, rows, draw_row):
+        """Framed box in the upper right corner of the axes; returns the y below it."""
+        width = max(len(text) for _, text in rows) * 7 + 40
+        height = len(rows) * 18 + 10
+        x = self.right - width - 10
+        out = [f'<rect x="{x}" y="{y}" width="{width}" height="{height}" rx="3" fill="white" fill-opacity="0.85" stroke="#444"/>']
+        for row, (entry, text) in enumerate(rows):
+            row_y = y + 18 * row + 19
+            out.append(draw_row(x + 8, row_y, entry))
+            out.append(f'<text x="{x + 34 if entry else x + 8}" y="{row_y + 4}">{escape(text)}</text>')
+        self.parts.extend(out)
+        return y + height + 8
+
+    @staticmethod
+    def _swatch(x, y, entry):
+        kind, color, linestyle, _ = entry
+        if kind == "bar":
+            return f'<rect x="{x}" y="{y - 5}" width="20" height="10" fill="{color}" fill-opacity="0.7"/>'
+        return f'<line x1="{x}" x2="{x + 20}" y1="{y}" y2="{y}" {_SvgPlot._stroke(color, linestyle)}/>'
+
+    def xticks(self, labels):
+        for index, label in enumerate(labels):
+            x, y = self.x(index), self.bottom
+            self.parts.append(f'<line x1="{x}" x2="{x}" y1="{y}" y2="{y + 5}" stroke="black"/>')
+            self.parts.append(f'<text x="{x}" y="{y + 14}" text-anchor="end" transform="rotate(-45 {x} {y + 14})">{escape(label)}</text>')
+
+    def to_svg(self):
+        value = self.low
+        ticks = []
+        while value <= self.high + 1e-9:
+            y = self.y(value)
+            ticks.append(f'<line x1="{self.left - 5}" x2="{self.left}" y1="{y}" y2="{y}" stroke="black"/>')
+            ticks.append(f'<text x="{self.left - 8}" y="{y + 4}" text-anchor="end">{_number(round(value, 6))}</text>')
+            value += self.step
+        corner = self.top + 10
+        for lines in self.boxes:
+            corner = self._box(corner, [(None, line) for line in lines], lambda x, y, entry: "")
+        if self.legend:
+            self._box(corner, [(entry, entry[3]) for entry in self.legend], self._swatch)
+        middle_x, middle_y = (self.left + self.right) / 2, (self.top + self.bottom) / 2
+        return "".join([
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}" '
+            f'viewBox="0 0 {self.width} {self.height}" font-family="DejaVu Sans, Arial, sans-serif" font-size="11">',
+            f'<rect width="{self.width}" height="{self.height}" fill="white"/>',
+            *self.parts,
+            f'<rect x="{self.left}" y="{self.top}" width="{self.right - self.left}" height="{self.bottom - self.top}" fill="none" stroke="black"/>',
+            *ticks,
+            f'<text x="{middle_x}" y="{self.top - 15}" text-anchor="middle" font-size="14">{escape(self.title)}</text>',
+            f'<text x="{middle_x}" y="{self.height - 10}" text-anchor="middle" font-size="12">{escape(self.xlabel)}</text>',
+            f'<text x="18" y="{middle_y}" text-anchor="middle" font-size="12" transform="rotate(-90 18 {middle_y})">{escape(self.ylabel)}</text>',
+            "</svg>"
+        ])
+
+
+def _svg_line(spec):
+    plot = _SvgPlot(CHART_VARIANTS["line"][0], len(spec["dates"]), spec["ideal"] + spec["actual"],
+                    "Sprint Burndown Chart", "Date", "Remaining Story Points")
+    plot.grid()
+    plot.line(spec["ideal"], "blue", "Ideal Burndown", markers=True)
+    plot.line(spec["actual"], "red", "Actual Burndown", markers=True)
+    plot.xticks(spec["dates"])
+    return plot
+
+
+def _svg_bars(spec):
+    labels = spec["labels"]
+    values = spec["open_points"] + spec["closed_points"] + spec["cumulative_closed"] + [spec["initial_commitment"]]
+    plot = _SvgPlot(CHART_VARIANTS["bars"][0], len(labels), values, spec["title"], "Date", "Story Points")
+    plot.grid(x=False, linestyle="--", alpha=0.7)
+    plot.bars(spec["open_points"], "red", "Open Story Points", -0.175)
+    plot.bars(spec["closed_points"], "blue", "Closed Story Points", 0.175)
+    plot.line(spec["open_points"], "red", "Open Points Trend", width=1.5)
+    plot.line(spec["cumulative_closed"], "green", "Cumulative Closed", linestyle="--")
+    plot.vline(0, "green", "Sprint Start", linestyle=":")
+    plot.vline(len(labels) - 1, "purple", "Sprint End", linestyle=":")
+    plot.vline(spec["today_index"], "gray", "Today", linestyle="--", alpha=0.5)
+    plot.hline(0, "black")
+    plot.hline(spec["initial_commitment"], "orange", "Initial Commitment", linestyle="--", alpha=0.7)
+    plot.xticks(labels)
+    return plot
+
+
+def _svg_detailed(spec):
+    plot = _SvgPlot(CHART_VARIANTS["detailed"][0], len(spec["dates"]), spec["ideal"] + spec["actual"],
+                    spec["title"], "Date", "Remaining Story Points")
+    plot.grid(linestyle="--", alpha=0.7)
+    plot.line(spec["ideal"], "blue", "Ideal Burndown", markers=True)
+    if spec["actual_dates"]:
+        plot.line(spec["actual"], "red", "Actual Burndown", markers=True)
+    plot.xticks(spec["dates"])
+    plot.text_box(spec["info"].split("\n"))
+    return plot
+
+
+SVG_VARIANTS = {
+    "line": _svg_line,
+    "bars": _svg_bars,
+    "detailed": _svg_detailed,
+}
+
+
+def render_svg(spec):
+    """Render a chart spec to an SVG document without matplotlib; cheap enough to run in the request worker."""
+    return SVG_VARIANTS[spec["variant"]](spec).to_svg()
+
+
+def _warm_up():
+    """Load matplotlib and its font cache once per pool process (run as the pool initializer)."""
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(1, 1))
+    fig.add_subplot().set_title("warm-up")
+    fig.savefig(BytesIO(), format="png")
+
+
+def _ready():
+    return True
+
+
+class RenderPool:
+    """Bounded pool of processes that turn chart specs into PNG bytes.
+
+    Keeps CPU-bound matplotlib work off the request workers. At most max_pending
+    renders are queued per request worker; a caller that cannot get a slot within
+    timeout seconds gets RenderQueueFull. With workers=0 rendering happens inline
+    (e.g. single-file desktop builds). start() spawns and warms the processes ahead
+    of the first render; otherwise that happens on the first render() call.
+    """
+
+    def __init__(self, workers=2, max_pending=8, timeout=30):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: the pool must not inherit the request worker's threads and sockets
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"),
+                                                     initializer=_warm_up)
+            return self._executor
+
+    def start(self):
+        """Spawn every pool process now and let it warm up in the background."""
+        if self.workers <= 0:
+            return
+        executor = self._get_executor()
+        # The executor spawns processes on demand, one per task it cannot hand to an idle one
+        for _ in range(self.workers):
+            executor.submit(_ready)
+
+    def render(self, spec):
+        if self.workers <= 0:
+            return render_png(spec)
+        if not self._slots.acquire(timeout=self.timeout):
+            raise RenderQueueFull("Chart render queue is full, try again shortly")
+        try:
+            return self._get_executor().submit(render_png, spec).result(timeout=self.timeout)
+        except BrokenProcessPool:
+            logger.error("Render pool died, restarting it on the next request")
+            with self._lock:
+                self._executor = None
+            raise
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
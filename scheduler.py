@@ -0,0 +1,98 @@
+import logging
+import os
+import threading
+import time
+
+from cache import try_file_lock
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshScheduler:
+    """Background thread that re-runs refresh jobs so requests find warm data.
+
+    jobs is a callable returning (key, fn) pairs; every interval seconds each fn is
+    run. trigger(key, fn) runs one job right away on its own thread, e.g. after a
+    request was answered from stale data. A non-blocking lock file per key makes
+    sure only one gunicorn worker on the host refreshes a job at a time; the others
+    skip it instead of queueing up behind it. Every worker runs its own loop, so a
+    stamp file records each job's last successful run and the job is skipped while
+    some worker ran it less than an interval ago.
+    """
+
+    def __init__(self, interval, jobs, lock_dir):
+        self.interval = interval
+        self.jobs = jobs
+        self.lock_dir = lock_dir
+        self._lock = threading.Lock()
+        self._running = set()
+        self._thread = None
+        self._stop = threading.Event()
+        os.makedirs(lock_dir, mode=0o700, exist_ok=True)
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None or self.interval <= 0:
+                return
+            self._thread = threading.Thread(target=self._loop, name="refresh-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def trigger(self, key, fn):
+        with self._lock:
+            if key in self._running:
+                return
+            self._running.add(key)
+        threading.Thread(target=self._run_claimed, args=(key, fn), name=f"refresh-{key[:8]}", daemon=True).start()
+
+    def run(self, key, fn):
+        """Run a job now unless this or another worker is already running it; returns whether it ran."""
+        with self._lock:
+            if key in self._running:
+                return False
+            self._running.add(key)
+        return self._run_claimed(key, fn)
+
+    def _run_claimed(self, key, fn):
+        try:
+            with try_file_lock(os.path.join(self.lock_dir, f"{key}.lock")) as acquired:
+                if not acquired or self._ran_recently(key):
+                    return False
+                fn()
+                self._stamp(key)
+                return True
+        except Exception as e:
+            logger.warning(f"Background refresh {key[:8]} failed: {str(e)}")
+            return False
+        finally:
+            with self._lock:
+                self._running.discard(key)
+
+    def _stamp_path(self, key):
+        return os.path.join(self.lock_dir, f"{key}.done")
+
+    def _ran_recently(self, key):
+        try:
+            age = time.time() - os.path.getmtime(self._stamp_path(key))
+        except FileNotFoundError:
+            return False
+        # A little slack so the worker whose loop ran it last is not skipped by its own timing jitter
+        return age < self.interval * 0.9
+
+    def _stamp(self, key):
+        with open(self._stamp_path(key), "a"):
+            pass
+        os.utime(self._stamp_path(key))
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                jobs = self.jobs()
+            except Exception as e:
+                logger.warning(f"Could not list refresh jobs: {str(e)}")
+                jobs = []
+            for key, fn in jobs:
+                self.run(key, fn)
+            self._stop.wait(self.interval)
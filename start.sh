@@ -1,7 +1,12 @@
 #!/bin/sh
+# Requests carry their own DashboardConfig, so one process can serve many of them
+# on threads while they wait on GitHub
 exec gunicorn "app:app" \
+    --config gunicorn.conf.py \
     --bind 0.0.0.0:8000 \
-    --workers 4 \
+    --worker-class gthread \
+    --workers "${GUNICORN_WORKERS:-2}" \
+    --threads "${GUNICORN_THREADS:-8}" \
     --timeout 120 \
     --access-logfile - \
     --error-logfile -
@@ -0,0 +1,31 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# app reads its configuration at import time: keep caches in a scratch directory,
+# render inline and leave the background refresher off
+os.environ["SNAPSHOT_CACHE_DIR"] = tempfile.mkdtemp(prefix="dashboards-test-")
+os.environ["REFRESH_INTERVAL"] = "0"
+os.environ["RENDER_WORKERS"] = "0"
+os.environ["GITHUB_TOKEN"] = "env-token"
+os.environ["GITHUB_WEBHOOK_SECRET"] = "test-secret"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    for store in (app_module.snapshot_cache, app_module.task_store, app_module.resolution_index):
+        store.clear()
+    yield app_module
+    for store in (app_module.snapshot_cache, app_module.task_store, app_module.resolution_index):
+        store.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.app.test_client()
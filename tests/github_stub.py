@@ -0,0 +1,73 @@
+import json
+import re
+import threading
+from urllib.parse import urlsplit
+
+import requests
+
+SPRINT = {"title": "Sprint 1", "startDate": "2024-05-06", "duration": 14}
+MILESTONES = [{"title": "Alpha", "number": 1}, {"title": "Beta", "number": 2}]
+
+
+def task_node(repo, number, milestone, points, closed_day=None):
+    """A [Task] issue item of a project board, as the items selection returns it."""
+    return {
+        "content": {
+            "id": f"I_{repo}_{number}", "number": number, "title": f"[Task] {repo} #{number}",
+            "state": "CLOSED" if closed_day else "OPEN",
+            "createdAt": "2024-05-06T09:00:00Z",
+            "closedAt": f"{closed_day}T09:00:00Z" if closed_day else None,
+            "milestone": {"number": milestone},
+            "repository": {"nameWithOwner": repo}
+        },
+        "storyPoints": {"number": points},
+        "sprint": SPRINT
+    }
+
+
+def project(project_id, items):
+    return {
+        "id": project_id,
+        "title": "Board",
+        "fields": {"nodes": [
+            {"id": "F_SP", "name": "Story Points", "__typename": "ProjectV2Field"},
+            {"id": "F_SPR", "name": "Sprint", "__typename": "ProjectV2IterationField",
+             "configuration": {"iterations": [SPRINT], "completedIterations": []}}
+        ]},
+        "items": {"nodes": items, "pageInfo": {"hasNextPage": False, "endCursor": None}}
+    }
+
+
+class StubGitHub:
+    """Answers the app's REST and GraphQL calls from fixed boards ({repo: project}).
+
+    Records the token and repo each call was made for.
+    """
+
+    def __init__(self, boards):
+        self.boards = boards
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, method, url, headers=None, **kwargs):
+        token = (headers or {}).get("Authorization", "").split(" ")[-1]
+        query = kwargs.get("json") or {}
+        if method == "GET":
+            owner, name = urlsplit(url).path.split("/")[2:4]
+            repo = f"{owner}/{name}"
+            body = MILESTONES if url.split("?")[0].endswith("/milestones") else []
+        elif "owner" in (query.get("variables") or {}):
+            repo = f"{query['variables']['owner']}/{query['variables']['name']}"
+            body = {"data": {"repository": {"projectsV2": {"nodes": [self.boards[repo]]}}}}
+        else:
+            project_id = re.search(r'node\(id: "([^"]+)"\)', query["query"]).group(1)
+            repo = next(repo for repo, board in self.boards.items() if board["id"] == project_id)
+            body = {"data": {"node": self.boards[repo]}}
+        with self._lock:
+            self.calls.append((token, repo))
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(body).encode("utf-8")
+        response.headers["Content-Type"] = "application/json"
+        response.url = url
+        return response
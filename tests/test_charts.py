@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+
+from github_stub import StubGitHub, project, task_node
+
+REPO = "octo-org/apples"
+
+
+def chart_args(milestone="Alpha"):
+    return {"github_token": "token-apples", "github_repo": REPO, "milestone_title": milestone,
+            "project_title": "Board", "sprint": "Sprint 1"}
+
+
+@pytest.fixture
+def board(app, monkeypatch):
+    items = [task_node(REPO, 1, 1, 3), task_node(REPO, 2, 1, 5, closed_day="2024-05-08"), task_node(REPO, 3, 2, 8)]
+    stub = StubGitHub({REPO: project("PVT_apples", items)})
+    monkeypatch.setattr(app.github.session, "request", stub)
+    return stub
+
+
+def test_shared_board_counts_only_this_repos_tasks(app, client, board):
+    expected = client.get("/api/burndownchart", query_string=chart_args()).get_json()
+    app.snapshot_cache.clear()
+    app.task_store.clear()
+    # An org-level board also holds another repo's tasks, whose milestone #1 is a different one
+    board.boards[REPO]["items"]["nodes"].append(task_node("octo-org/pears", 1, 1, 13))
+
+    assert client.get("/api/burndownchart", query_string=chart_args()).get_json() == expected
+    assert expected["chart"][0]["actual_remaining"] == 8
+
+
+def test_recorded_sprint_is_answered_from_history(app, client, board):
+    config = app.DashboardConfig.from_args(chart_args())
+    key = app.dashboard_key(config)
+    start_day = date(2024, 5, 6).toordinal()
+    app.burndown_history.delete(key)
+    for offset in range(14):
+        app.burndown_history.record(key, start_day + offset, 20, offset)
+    try:
+        chart = client.get("/api/burndownchart", query_string=chart_args()).get_json()["chart"]
+    finally:
+        app.burndown_history.delete(key)
+
+    assert [point["actual_remaining"] for point in chart] == [20 - offset for offset in range(14)]
+    # Only the project's field map was fetched: no milestone list, no item pages
+    assert len(board.calls) == 1
+    assert app.snapshot_cache.get(key) is None
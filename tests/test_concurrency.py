@@ -0,0 +1,60 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from github_stub import StubGitHub, project, task_node
+
+# Two repos with their own tokens and tasks, so a chart built from the other repo's
+# (or milestone's) data cannot pass for the right one
+DASHBOARDS = {
+    "octo-org/apples": {"token": "token-apples", "project_id": "PVT_apples"},
+    "octo-org/pears": {"token": "token-pears", "project_id": "PVT_pears"},
+}
+CONFIGS = [("octo-org/apples", "Alpha"), ("octo-org/apples", "Beta"), ("octo-org/pears", "Beta")]
+
+
+def project_items(repo):
+    offset = 100 if repo == "octo-org/apples" else 200
+    return [task_node(repo, offset + index, 1 + index % 2, (index + offset // 100) % 8 + 1,
+                      "2024-05-1%d" % (index % 7) if index % 3 == 0 else None)
+            for index in range(12)]
+
+
+@pytest.fixture
+def stub_github(app, monkeypatch):
+    stub = StubGitHub({repo: project(dashboard["project_id"], project_items(repo))
+                       for repo, dashboard in DASHBOARDS.items()})
+    monkeypatch.setattr(app.github.session, "request", stub)
+    return stub
+
+
+def chart_args(repo, milestone):
+    return {"github_token": DASHBOARDS[repo]["token"], "github_repo": repo, "milestone_title": milestone,
+            "project_title": "Board", "sprint": "Sprint 1"}
+
+
+def test_concurrent_dashboards_do_not_share_state(app, client, stub_github, monkeypatch):
+    expected = {config: client.get("/api/burndownchart", query_string=chart_args(*config)).get_json()
+                for config in CONFIGS}
+    assert all("chart" in chart for chart in expected.values())
+    assert len({json.dumps(chart, sort_keys=True) for chart in expected.values()}) == len(CONFIGS)
+
+    # With every cache off, each request resolves and loads its dashboard from GitHub again
+    for store in (app.snapshot_cache, app.task_store, app.resolution_index):
+        monkeypatch.setattr(store, "ttl", 0)
+    stub_github.calls.clear()
+
+    def fetch(config):
+        with app.app.test_client() as thread_client:
+            return config, thread_client.get("/api/burndownchart", query_string=chart_args(*config)).get_json()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(fetch, CONFIGS * 20))
+
+    for config, chart in results:
+        assert chart == expected[config]
+    # Concurrent loads of one dashboard are coalesced, but both repos went upstream
+    assert {repo for _, repo in stub_github.calls} == set(DASHBOARDS)
+    for token, repo in stub_github.calls:
+        assert token == DASHBOARDS[repo]["token"]
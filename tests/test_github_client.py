@@ -0,0 +1,65 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from cache import SnapshotCache
+from github_client import CachedResponse, GitHubClient
+
+ETAG = '"milestones-v1"'
+MILESTONES = [{"title": "Alpha", "number": 1}]
+
+
+class MilestonesHandler(BaseHTTPRequestHandler):
+    """Serves MILESTONES with an ETag, and 304 to requests that send it back."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps(MILESTONES).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MilestonesHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_conditional_answers_304_from_the_stored_body(server, tmp_path):
+    api_url = "http://127.0.0.1:%d" % server.server_address[1]
+    client = GitHubClient(api_url=api_url, validator_store=SnapshotCache(str(tmp_path), ttl=60))
+    url = f"{api_url}/repos/octo-org/apples/milestones"
+    headers = {"Authorization": "token test-token"}
+
+    first = client.get_conditional(url, headers=headers)
+    assert first.status_code == 200
+    assert first.json() == MILESTONES
+    assert client.stats()["not_modified"] == 0
+
+    second = client.get_conditional(url, headers=headers)
+    assert isinstance(second, CachedResponse)
+    assert second.json() == MILESTONES
+    assert client.stats()["not_modified"] == 1
+    assert server.requests[1]["If-None-Match"] == ETAG
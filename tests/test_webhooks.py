@@ -0,0 +1,129 @@
+import hashlib
+import hmac
+import json
+import os
+import time
+
+import pytest
+
+from analytics import Task, parse_day
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "webhooks")
+
+REPO = "octo-org/dashboards"
+PROJECT_ID = "PVT_kwDOP1"
+SPRINT = {"title": "Sprint 1", "startDate": "2024-05-06", "duration": 14}
+CUSTOM_FIELDS = {
+    "Story Points": {"id": "PVTF_lADOSP", "type": "ProjectV2Field", "options": [], "configuration": {}},
+    "Sprint": {"id": "PVTIF_lADOSI", "type": "ProjectV2IterationField", "options": [],
+               "configuration": {"iterations": [SPRINT], "completedIterations": []}}
+}
+
+
+def task(number, milestone, points):
+    return (REPO, milestone, SPRINT, Task(number, "OPEN", parse_day("2024-05-06T09:00:00Z"), None, points, "Sprint 1"))
+
+
+@pytest.fixture
+def seeded(app, monkeypatch):
+    """A task store with three tasks and the milestone snapshots built from it; GitHub is off limits."""
+    items = {"I_kwDOA1": task(101, 1, 3), "I_kwDOA2": task(102, 1, 5), "I_kwDOA3": task(103, 2, 8)}
+    app.task_store.set("store", {
+        "schema": app.field_schema(CUSTOM_FIELDS), "repo": REPO, "project_id": PROJECT_ID,
+        "full_sync_at": time.time(), "items": items, "custom_fields": CUSTOM_FIELDS,
+        "watermark": "2024-05-06T00:00:00Z"
+    })
+    for key, number in (("milestone-1", 1), ("milestone-2", 2)):
+        app.snapshot_cache.set(key, app.milestone_snapshot("store", REPO, number, CUSTOM_FIELDS, items.values()))
+
+    def no_github(*args, **kwargs):
+        raise AssertionError("webhook handling must not call GitHub")
+    monkeypatch.setattr(app.github.session, "request", no_github)
+    yield app
+    for key in ("milestone-1", "milestone-2"):
+        app.burndown_history.delete(key)
+
+
+def deliver(client, event, fixture, secret="test-secret"):
+    with open(os.path.join(FIXTURES, fixture), "rb") as f:
+        body = f.read()
+    signature = "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return client.post("/api/webhook", data=body, content_type="application/json",
+                       headers={"X-GitHub-Event": event, "X-Hub-Signature-256": signature})
+
+
+def milestone_tasks(app, key):
+    return {task.number: task for task in app.snapshot_cache.get(key)["tasks"]}
+
+
+def test_rejects_bad_signature(client, seeded):
+    response = deliver(client, "issues", "issues_closed.json", secret="wrong")
+    assert response.status_code == 401
+    assert milestone_tasks(seeded, "milestone-1")[101].state == "OPEN"
+
+
+def test_rejects_missing_signature(client, seeded):
+    response = client.post("/api/webhook", json={"zen": "Keep it logically awesome."},
+                           headers={"X-GitHub-Event": "ping"})
+    assert response.status_code == 401
+
+
+def test_ping_and_unsupported_events(client, seeded):
+    assert deliver(client, "ping", "milestone_edited.json").get_json() == {"message": "pong"}
+    assert deliver(client, "push", "milestone_edited.json").status_code == 202
+
+
+def test_issue_closed_updates_snapshot_in_place(client, seeded):
+    response = deliver(client, "issues", "issues_closed.json")
+    assert response.status_code == 200
+    assert response.get_json()["updated_stores"] == 1
+    closed = milestone_tasks(seeded, "milestone-1")[101]
+    assert closed.state == "CLOSED"
+    assert closed.closed_day == parse_day("2024-05-09T15:40:02Z")
+    # Project field values are kept from the store
+    assert closed.points == 3
+    assert closed.sprint == "Sprint 1"
+
+
+def test_issue_moved_to_another_milestone(client, seeded):
+    assert deliver(client, "issues", "issues_milestoned.json").status_code == 200
+    assert 102 not in milestone_tasks(seeded, "milestone-1")
+    assert milestone_tasks(seeded, "milestone-2")[102].points == 5
+
+
+def test_item_removed_from_project(client, seeded):
+    assert deliver(client, "projects_v2_item", "projects_v2_item_deleted.json").status_code == 200
+    assert 102 not in milestone_tasks(seeded, "milestone-1")
+    assert "I_kwDOA2" not in seeded.task_store.get("store")["items"]
+
+
+def test_item_field_edit_looks_up_the_item(client, seeded, monkeypatch):
+    lookups = []
+
+    def fetch_task_items(config, project_id, custom_fields, issue_ids):
+        lookups.append((config.repo, project_id, issue_ids))
+        return {"I_kwDOA1": task(101, 1, 13)}
+    monkeypatch.setattr(seeded, "fetch_task_items", fetch_task_items)
+
+    assert deliver(client, "projects_v2_item", "projects_v2_item_edited.json").status_code == 200
+    assert lookups == [(REPO, PROJECT_ID, ["I_kwDOA1"])]
+    assert milestone_tasks(seeded, "milestone-1")[101].points == 13
+
+
+def test_milestone_rename_invalidates_snapshot_and_index(client, seeded):
+    config = seeded.DashboardConfig("env-token", REPO, "Milestone 1", "Board")
+    seeded.update_index(config, "milestones", {"Milestone 1": 1, "Milestone 2": 2})
+
+    assert deliver(client, "milestone", "milestone_edited.json").status_code == 200
+    assert seeded.snapshot_cache.get("milestone-1") is None
+    assert seeded.snapshot_cache.get("milestone-2") is not None
+    assert seeded.indexed(config, "milestones", "Milestone 1") is None
+    assert seeded.indexed(config, "milestones", "Milestone 2") == 2
+
+
+def test_events_for_other_repositories_are_ignored(client, seeded):
+    with open(os.path.join(FIXTURES, "issues_closed.json")) as f:
+        payload = json.load(f)
+    payload["repository"]["full_name"] = "octo-org/elsewhere"
+    assert seeded.apply_webhook_event("issues", payload) == 0
+    assert milestone_tasks(seeded, "milestone-1")[101].state == "OPEN"